@@ -1,7 +1,8 @@
 # app.py
 
 import streamlit as st
-from chatbot_core import rag_answer, init_chroma
+from chatbot_core import rag_answer_stream, init_chroma
+from vector.llm_client import get_llm_client
 from rich.console import Console
 
 # === SETUP ===
@@ -19,14 +20,19 @@ query = st.text_input("🧠 Your question", placeholder="e.g., How is AI used in
 
 # === RUN QUERY ===
 if st.button("🔍 Search") and query.strip():
-    with st.spinner("Mistral is thinking..."):
-        response, posts = rag_answer(query, collection)
+    with st.spinner("Searching posts..."):
+        tokens, posts = rag_answer_stream(query, collection)
 
     st.markdown("### 💡 Answer")
-    st.markdown(response)
+    st.write_stream(tokens)
 
     st.markdown("### 🔗 Referenced Posts")
     for i, post in enumerate(posts):
         url = post.get("url", "#")
         keyword = post.get("keyword", "N/A")
-        st.markdown(f"- **POST {i+1}** [{keyword}] → [🔗 Link]({url})")
\ No newline at end of file
+        st.markdown(f"- **POST {i+1}** [{keyword}] → [🔗 Link]({url})")
+
+# === METRICS ===
+# Per-call latency / token counts of the shared Mistral client, this server's equivalent of query_api's /metrics
+with st.sidebar.expander("📊 Mistral metrics"):
+    st.json(get_llm_client().metrics.snapshot())
@@ -0,0 +1,137 @@
+# corpus.py
+# Synthetic LinkedIn-like corpus for the benchmarks:
+#   raw/<keyword>/urn_li_activity_<id>_<suffix>.txt   scraper format (--- METADATA --- header,
+#                                                     body, optional OCR block), read by ingest_raw_to_chroma
+#   summaries/<id>.json                               summary JSON, read by embed_and_push
+# Generation is deterministic for a given seed and streams to disk, so 1M posts is fine.
+#
+# Usage: python benchmarks/corpus.py <out_dir> <n_posts> [--seed N]
+
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+KEYWORDS = ["ai startup", "series a", "llm agents", "developer tools", "climate tech", "fintech", "hiring", "product management"]
+CATEGORIES = ["Funding", "AI Tools", "Hiring", "Product Launch", "Research", "Career Advice", "Uncategorized"]
+
+SUBJECTS = ["Our team", "This startup", "The founder", "A seed-stage company", "The open-source community",
+            "Our customers", "The research group", "Every engineer I know", "The hiring manager", "This VC fund"]
+VERBS = ["just shipped", "raised", "is rethinking", "open-sourced", "benchmarked", "is hiring for",
+         "migrated to", "doubled down on", "cut the cost of", "launched"]
+OBJECTS = ["a retrieval-augmented assistant", "a $12M Series A", "vector search on Postgres", "an LLM agent framework",
+           "GPU inference at the edge", "a carbon accounting API", "its onboarding flow", "fine-tuned Mistral models",
+           "a remote-first engineering team", "real-time fraud detection", "the developer experience", "Kubernetes autoscaling"]
+TAILS = ["in under six months.", "with a team of five.", "and the results surprised us.", "— here is what we learned.",
+         "without a single outage.", "while keeping burn flat.", "for enterprise customers in Europe.",
+         "and it changed how we plan sprints.", "after three failed attempts.", "using only open models."]
+HASHTAGS = ["#AI", "#startups", "#LLM", "#hiring", "#fundraising", "#devtools", "#climate", "#fintech", "#productmanagement"]
+
+SLIDE_WORDS = ["Roadmap", "Q3 metrics", "Architecture", "Lessons learned", "Pricing", "Team", "Market size", "Traction"]
+
+BASE_ACTIVITY_ID = 7100000000000000000
+START_DATE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def sentence(rng):
+    return f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(TAILS)}"
+
+
+def post_body(rng):
+    paragraphs = []
+    for _ in range(rng.randint(1, 4)):
+        paragraphs.append(" ".join(sentence(rng) for _ in range(rng.randint(2, 6))))
+    paragraphs.append(" ".join(rng.sample(HASHTAGS, 3)))
+    return "\n\n".join(paragraphs)
+
+
+def ocr_block(rng):
+    """Carousel slides: long and repetitive, like real OCR'd decks."""
+    slides = []
+    for n in range(1, rng.randint(4, 12)):
+        slides.append(f"Slide {n}: {rng.choice(SLIDE_WORDS)}\n" + " ".join(sentence(rng) for _ in range(rng.randint(3, 8))))
+    return "\n\n--- OCR EXTRACTED TEXT ---\n" + "\n".join(slides)
+
+
+def metadata_header(meta):
+    return "--- METADATA ---\n" + "\n".join(f"{k}: {v}" for k, v in meta.items()) + "\n----------------\n"
+
+
+def make_post(i, rng, ocr_ratio):
+    activity_id = BASE_ACTIVITY_ID + i
+    keyword = rng.choice(KEYWORDS)
+    likes, comments, shares = rng.randint(0, 2000), rng.randint(0, 300), rng.randint(0, 100)
+    engagement = likes + comments * 2 + shares * 3
+    scraped_at = START_DATE + timedelta(minutes=rng.randint(0, 180 * 24 * 60))
+    filename = f"urn_li_activity_{activity_id}_{i:x}.txt"
+    ocr_extracted = rng.random() < ocr_ratio
+    meta = {
+        "keywordType": "keyword",
+        "keyword": keyword,
+        "url": f"https://www.linkedin.com/feed/update/urn:li:activity:{activity_id}",
+        "filename": filename,
+        "videoDownloaded": "false",
+        "ocrExtracted": "true" if ocr_extracted else "false",
+        "likeCount": likes,
+        "commentCount": comments,
+        "shareCount": shares,
+        "engagementScore": engagement,
+        "engagementTag": "🔥 High Engagement" if engagement > 50 else "",
+        "sentiment": rng.choice(["positive", "neutral", "negative"]),
+        "topComment": sentence(rng),
+        "externalLinks": "",
+        "category": rng.choice(CATEGORIES),
+        "scrapedAt": scraped_at.isoformat().replace("+00:00", "Z"),
+    }
+    body = post_body(rng)
+    text = metadata_header(meta) + body + (ocr_block(rng) if ocr_extracted else "")
+    return meta, body, text
+
+
+def generate_corpus(out_dir, n_posts, seed=0, ocr_ratio=0.3):
+    """Write n_posts raw files + summaries under out_dir → {"raw_dir", "summary_dir", "posts"}."""
+    rng = random.Random(seed)
+    raw_dir = os.path.join(out_dir, "raw")
+    summary_dir = os.path.join(out_dir, "summaries")
+    os.makedirs(summary_dir, exist_ok=True)
+    for keyword in KEYWORDS:
+        os.makedirs(os.path.join(raw_dir, keyword.replace(" ", "-")), exist_ok=True)
+
+    for i in range(n_posts):
+        meta, body, text = make_post(i, rng, ocr_ratio)
+        with open(os.path.join(raw_dir, meta["keyword"].replace(" ", "-"), meta["filename"]), "w", encoding="utf-8") as f:
+            f.write(text)
+        with open(os.path.join(summary_dir, f"{BASE_ACTIVITY_ID + i}.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "summary": body.split("\n\n")[0],
+                "keyword": meta["keyword"],
+                "url": meta["url"],
+                "timestamp": meta["scrapedAt"],
+                "engagementScore": meta["engagementScore"],
+            }, f)
+    return {"raw_dir": raw_dir, "summary_dir": summary_dir, "posts": n_posts}
+
+
+def sample_queries(n, seed=0):
+    """Natural-language questions drawn from the same vocabulary as the posts."""
+    rng = random.Random(seed + 1)
+    templates = ["What are people saying about {}?", "Who {} {}?", "Latest news on {} in {}", "{} {}"]
+    queries = []
+    for _ in range(n):
+        template = rng.choice(templates)
+        if template.count("{}") == 1:
+            queries.append(template.format(rng.choice(OBJECTS)))
+        else:
+            queries.append(template.format(rng.choice(VERBS + OBJECTS), rng.choice(KEYWORDS)))
+    return queries
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python benchmarks/corpus.py <out_dir> <n_posts> [--seed N]")
+        sys.exit(1)
+
+    seed = int(sys.argv[sys.argv.index("--seed") + 1]) if "--seed" in sys.argv else 0
+    corpus = generate_corpus(sys.argv[1], int(sys.argv[2]), seed=seed)
+    print(f"✅ Wrote {corpus['posts']} posts → {corpus['raw_dir']} and {corpus['summary_dir']}")
@@ -0,0 +1,348 @@
+# run_benchmarks.py
+# End-to-end benchmarks over a synthetic corpus (benchmarks/corpus.py). Suites are split
+# by the Chroma client API the benchmarked modules use, since no chromadb release has both:
+#
+#   persistent client (chromadb >= 0.4)
+#     ingest     vector.ingest_raw_to_chroma.ingest (cold + no-change rescan)
+#     rag        chatbot_core.rag_answer with a stub LLM, so only retrieval + prompt building is timed
+#   legacy duckdb client (chromadb 0.3.x)
+#     summaries  embed_and_push.process_summaries
+#     search     cli_query.search_query (sequential) and query_api /search through its micro-batcher
+#
+# By default only the suites the installed chromadb supports are run. Everything runs
+# inside a scratch working directory, so the relative Chroma / manifest / cache paths the
+# scripts use never touch real data. Results are written as one JSON file.
+#
+# Usage:
+#   python benchmarks/run_benchmarks.py --posts 10000 [--suites ingest,rag] [--queries 200]
+#       [--concurrency 16] [--modes vector,hybrid] [--workdir DIR] [--out results.json]
+#       [--baseline previous.json] [--tolerance 0.2]
+# With --baseline, exits 1 when a latency/time metric got slower (or a throughput metric
+# got lower) by more than --tolerance.
+#
+# Runs write to benchmarks/results/ by default, which is git-ignored. The one checked-in
+# result is the agreed regression baseline in benchmarks/baselines/: the ingest suite,
+# 2000 posts, seed 0, chromadb 1.5.9 on a 1-CPU Linux machine (see its "meta"). Timings
+# only compare on similar hardware, so re-record it there when the machine changes:
+#   python benchmarks/run_benchmarks.py --posts 2000 --suites ingest \
+#       --baseline benchmarks/baselines/ingest-2000-chromadb-1.5.9.json
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)  # everything is imported as vector.<module>, so registries are shared
+
+from benchmarks.corpus import generate_corpus, sample_queries
+from vector.micro_batcher import LatencyStats
+
+SUITE_CLIENTS = {"ingest": "persistent", "rag": "persistent", "summaries": "legacy", "search": "legacy"}
+SUITES = tuple(SUITE_CLIENTS)
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")  # git-ignored run output
+COMPARABLE_META = ("posts", "seed", "cpu_count", "chromadb")
+
+
+# === HELPERS ===
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def latency_summary(seconds, wall_seconds=None):
+    """p50/p95/p99 of per-request latencies; throughput over the wall time (sequential: their sum)."""
+    stats = LatencyStats(window=len(seconds) or 1)
+    for s in seconds:
+        stats.record(s)
+    summary = stats.snapshot()
+    summary.pop("avg_batch_size", None)
+    wall_seconds = wall_seconds if wall_seconds is not None else sum(seconds)
+    summary["throughput_rps"] = len(seconds) / wall_seconds if wall_seconds else None
+    return summary
+
+
+def installed_chroma_api():
+    """"persistent" (chromadb >= 0.4), "legacy" (0.3.x duckdb client) or None when not installed."""
+    try:
+        import chromadb
+    except ImportError:
+        return None
+    return "persistent" if hasattr(chromadb, "PersistentClient") else "legacy"
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+class StubLLMClient:
+    """Stands in for vector.llm_client.LLMClient: streams a fixed answer, records prompt sizes."""
+
+    def __init__(self, tokens=64, token_delay=0.0):
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.prompt_chars = []
+
+    def stream(self, prompt, **kwargs):
+        self.prompt_chars.append(len(prompt))
+        for i in range(self.tokens):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield f"tok{i} "
+
+
+# === SUITES ===
+def bench_ingest(corpus):
+    from vector import ingest_raw_to_chroma
+
+    ingest_raw_to_chroma.DATA_ROOT = corpus["raw_dir"]
+    _, cold = timed(ingest_raw_to_chroma.ingest)
+    _, rescan = timed(ingest_raw_to_chroma.ingest)  # nothing changed: manifest should skip every file
+
+    return {
+        "ingest_raw_to_chroma": {
+            "posts": corpus["posts"],
+            "chunks": ingest_raw_to_chroma.get_collection().count(),
+            "seconds": cold,
+            "docs_per_sec": corpus["posts"] / cold if cold else None,
+            "rescan_seconds": rescan,
+        },
+    }
+
+
+def bench_summaries(corpus):
+    import embed_and_push
+    return {"embed_and_push": embed_and_push.process_summaries(corpus["summary_dir"])}
+
+
+def bench_search(corpus, queries, modes, concurrency):
+    import embed_and_push
+    import cli_query
+    results = {}
+
+    if embed_and_push.get_collection().count() == 0:
+        embed_and_push.process_summaries(corpus["summary_dir"])
+
+    for mode in modes:
+        latencies = []
+        for q in queries:
+            _, seconds = timed(cli_query.search_query, q, mode=mode)
+            latencies.append(seconds)
+        results[f"cli_query.{mode}"] = latency_summary(latencies)
+
+    try:
+        import query_api
+    except ImportError as e:
+        print(f"⚠️ Skipping query_api benchmark: {e}")
+        return results
+
+    async def run(mode):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def one(q):
+            async with semaphore:
+                start = time.perf_counter()
+                await query_api.search(q=q, top_k=5, keyword_filter=None, min_rank=0.0, mode=mode)
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one(q) for q in queries))
+        await query_api.batcher.stop()
+        return latencies
+
+    for mode in modes:
+        query_api.batcher.stats = LatencyStats()
+        latencies, wall = timed(asyncio.run, run(mode))
+        summary = latency_summary(latencies, wall)
+        summary["avg_batch_size"] = query_api.batcher.stats.snapshot().get("avg_batch_size")
+        summary["concurrency"] = concurrency
+        results[f"query_api.{mode}"] = summary
+    return results
+
+
+def build_rag_collection(corpus, batch_size=256):
+    """Chunk + embed the raw posts with chatbot_core's own model into its collection (+ BM25 sidecar)."""
+    import chatbot_core
+    from vector.bm25_index import get_bm25_index
+    from vector.chunking import chunk_records
+    from vector.post_parser import parse_tree
+
+    collection = chatbot_core.init_chroma()
+    if collection.count():
+        return collection
+
+    model = chatbot_core.get_model()
+    bm25 = get_bm25_index(chatbot_core.CHROMA_DB_DIR, chatbot_core.COLLECTION_NAME)
+    ids, documents, metadatas = [], [], []
+
+    def flush():
+        embeddings = model.encode(documents, batch_size=64, show_progress_bar=False)
+        collection.add(ids=ids, documents=documents, metadatas=metadatas,
+                       embeddings=[e.tolist() for e in embeddings])
+        bm25.upsert(ids, documents)
+        ids.clear()
+        documents.clear()
+        metadatas.clear()
+
+    for record in parse_tree(corpus["raw_dir"]):
+        meta = record.metadata or {}
+        chunk_ids, chunk_docs, chunk_metas = chunk_records(os.path.basename(record.path), record.body or "", {
+            "url": meta.get("url", ""),
+            "keyword": meta.get("keyword", ""),
+            "category": meta.get("category", "Uncategorized"),
+            "timestamp": meta["scrapedAt"].isoformat() if meta.get("scrapedAt") else "",
+        })
+        ids += chunk_ids
+        documents += chunk_docs
+        metadatas += chunk_metas
+        if len(ids) >= batch_size:
+            flush()
+    if ids:
+        flush()
+    return collection
+
+
+def bench_rag(corpus, queries):
+    import chatbot_core
+
+    collection, build_seconds = timed(build_rag_collection, corpus)
+
+    stub = StubLLMClient()
+    chatbot_core.get_llm_client = lambda: stub
+    latencies = []
+    for q in queries:
+        _, seconds = timed(chatbot_core.rag_answer, q, collection)
+        latencies.append(seconds)
+
+    summary = latency_summary(latencies)
+    summary["index_build_seconds"] = build_seconds
+    summary["avg_prompt_chars"] = sum(stub.prompt_chars) / len(stub.prompt_chars) if stub.prompt_chars else None
+    return {"chatbot_core.rag_answer": summary}
+
+
+# === REGRESSION CHECK ===
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current, baseline, tolerance):
+    """→ [(metric, baseline, current, change)] that regressed by more than tolerance."""
+    regressions = []
+    old = flatten(baseline.get("results", {}))
+    for name, value in flatten(current.get("results", {})).items():
+        before = old.get(name)
+        if not before:
+            continue
+        change = (value - before) / before
+        if name.endswith(("_ms", "seconds")) and change > tolerance:
+            regressions.append((name, before, value, change))
+        elif name.endswith(("per_sec", "_rps")) and change < -tolerance:
+            regressions.append((name, before, value, change))
+    return regressions
+
+
+# === MAIN ===
+def main():
+    parser = argparse.ArgumentParser(description="Ingest / search / RAG benchmarks on a synthetic corpus")
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--suites", default=None, help="default: every suite the installed chromadb supports")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--modes", default="vector,hybrid")
+    parser.add_argument("--workdir", default=None, help="scratch dir (default: a new temp dir)")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    api = installed_chroma_api()
+    if api is None:
+        parser.error("chromadb is not installed")
+    suites = [s for s in args.suites.split(",") if s] if args.suites else [s for s in SUITES if SUITE_CLIENTS[s] == api]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    unsupported = [s for s in suites if SUITE_CLIENTS[s] != api]
+    if unsupported:
+        parser.error(f"suites {', '.join(unsupported)} need the {SUITE_CLIENTS[unsupported[0]]} Chroma client; "
+                     f"the installed chromadb provides the {api} one")
+
+    out = os.path.abspath(args.out or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{args.posts}.json"))
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="insight-bench-"))
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)  # chroma_db, .chromadb_store, manifests, caches and logs all land here
+    print(f"📂 Working directory: {workdir}")
+
+    corpus, gen_seconds = timed(generate_corpus, os.path.join(workdir, "corpus"), args.posts, seed=args.seed)
+    print(f"🧪 Generated {args.posts} posts in {gen_seconds:.1f}s")
+    queries = sample_queries(args.queries, seed=args.seed)
+    modes = [m for m in args.modes.split(",") if m]
+
+    results = {}
+    if "ingest" in suites:
+        results["ingest"] = bench_ingest(corpus)
+    if "summaries" in suites:
+        results["summaries"] = bench_summaries(corpus)
+    if "search" in suites:
+        results["search"] = bench_search(corpus, queries, modes, args.concurrency)
+    if "rag" in suites:
+        results["rag"] = bench_rag(corpus, queries)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "posts": args.posts,
+            "queries": args.queries,
+            "seed": args.seed,
+            "suites": suites,
+            "chromadb": __import__("chromadb").__version__,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to: {out}")
+
+    if baseline:
+        with open(baseline, encoding="utf-8") as f:
+            previous = json.load(f)
+        for key in COMPARABLE_META:
+            if previous.get("meta", {}).get(key) != report["meta"][key]:
+                print(f"⚠️ Baseline {key} is {previous.get('meta', {}).get(key)!r}, this run's is "
+                      f"{report['meta'][key]!r}; timings may not be comparable")
+        regressions = compare(report, previous, args.tolerance)
+        for name, before, after, change in regressions:
+            print(f"❌ {name}: {before:.2f} → {after:.2f} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {baseline}")
+
+
+if __name__ == "__main__":
+    main()
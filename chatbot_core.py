@@ -1,10 +1,13 @@
 # chatbot_core.py
 
 import os
-import chromadb
-import textwrap
-import subprocess
-from sentence_transformers import SentenceTransformer
+from datetime import datetime, timezone
+import numpy as np
+from vector.registry import get_or_create, get_embedder, get_chroma_collection
+from vector.embedding_backends import get_backend
+from vector.llm_client import get_llm_client, LLMError
+from vector.bm25_index import get_bm25_index, check_bm25_index, reciprocal_rank_fusion
+from vector.chunking import best_chunks
 
 # === CONFIG ===
 CHROMA_DB_DIR = "./chroma_db"
@@ -12,19 +15,37 @@ COLLECTION_NAME = "linkedin_posts"
 TOP_K = 3
 WRAP_WIDTH = 100
 
+# === RE-RANKING ===
+CANDIDATE_POOL = 20          # chunks; fetch more than TOP_K so the threshold can filter without starving the prompt
+SIMILARITY_THRESHOLD = 0.4   # on raw cosine similarity
+RANK_WEIGHT = 0.1            # blend in engagement rankScore (0..1); 0 disables
+RECENCY_WEIGHT = 0.05        # blend in recency (1 = today, 0.5 after RECENCY_HALF_LIFE_DAYS); 0 disables
+RECENCY_HALF_LIFE_DAYS = 30
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector")  # "hybrid" adds BM25 keyword candidates
+
 # === INIT ===
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
-model = SentenceTransformer("mixedbread-ai/mxbai-embed-large-v1")
-embedding_dim = model.get_sentence_embedding_dimension()
+EMBED_MODEL_NAME = "mixedbread-ai/mxbai-embed-large-v1"
+
+def get_model():
+    return get_embedder(EMBED_MODEL_NAME)
 
 # === INIT CHROMA ===
 def init_chroma():
-    client = chromadb.PersistentClient(path=CHROMA_DB_DIR)
-    return client.get_or_create_collection(name=COLLECTION_NAME)
+    backend = get_backend(f"sentence-transformers:{EMBED_MODEL_NAME}")
+    return get_chroma_collection(CHROMA_DB_DIR, COLLECTION_NAME, backend=backend)
+
+def get_keyword_index(collection):
+    """BM25 sidecar for hybrid mode, checked against the collection once per process."""
+    return get_or_create(
+        ("bm25-checked", CHROMA_DB_DIR, COLLECTION_NAME),
+        lambda: check_bm25_index(get_bm25_index(CHROMA_DB_DIR, COLLECTION_NAME), collection,
+                                 CHROMA_DB_DIR, COLLECTION_NAME),
+    )
 
 # === BUILD RAG PROMPT ===
 def build_prompt(query, docs, urls):
-    context = "\n\n".join(f"POST {i+1}:\n{textwrap.shorten(d, width=1000)}" for i, d in enumerate(docs))
+    context = "\n\n".join(f"POST {i+1}:\n{d}" for i, d in enumerate(docs))
     links = "\n".join(f"POST {i+1} → {url}" for i, url in enumerate(urls))
     return f"""You are a helpful assistant analyzing LinkedIn posts.
 
@@ -42,55 +63,110 @@ Instructions:
 {links if links else ""}
 """
 
-# === CALL LOCAL MISTRAL ===
-def ask_mistral(prompt):
+# === CALL LOCAL MISTRAL (Ollama HTTP, streamed) ===
+def ask_mistral_stream(prompt):
     try:
-        result = subprocess.run(
-            ["ollama", "run", "mistral"],
-            input=prompt.encode("utf-8"),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=90
-        )
-        return result.stdout.decode("utf-8").strip()
-    except Exception as e:
-        return f"⚠️ Error calling Mistral: {e}"
-
-# === MAIN RAG FUNCTION ===
-def rag_answer(query, collection):
-    query_embedding = model.encode(query).tolist()
+        yield from get_llm_client().stream(prompt)
+    except LLMError as e:
+        yield f"⚠️ Error calling Mistral: {e}"
+
+def ask_mistral(prompt):
+    return "".join(ask_mistral_stream(prompt)).strip()
+
+# === RE-RANK CANDIDATES ===
+def recency_scores(metas, now=None):
+    now = now or datetime.now(timezone.utc)
+    scores = np.zeros(len(metas), dtype=np.float32)
+    for i, meta in enumerate(metas):
+        try:
+            ts = datetime.fromisoformat(str(meta.get("timestamp", "")).replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        age_days = max((now - ts).total_seconds() / 86400, 0.0)
+        scores[i] = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    return scores
+
+def rerank(query_embedding, doc_embeddings, metas):
+    """
+    Cosine similarity of every candidate in one matrix-vector product, drop those
+    under SIMILARITY_THRESHOLD, then order by similarity blended with rankScore/recency.
+    Returns candidate indices, best first.
+    """
+    matrix = np.asarray(doc_embeddings, dtype=np.float32)
+    query = np.asarray(query_embedding, dtype=np.float32)
+    matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    query = query / max(np.linalg.norm(query), 1e-12)
+    similarities = matrix @ query
+
+    score = similarities.copy()
+    if RANK_WEIGHT:
+        score += RANK_WEIGHT * np.array([float(m.get("rankScore", 0) or 0) for m in metas], dtype=np.float32)
+    if RECENCY_WEIGHT:
+        score += RECENCY_WEIGHT * recency_scores(metas)
+
+    keep = np.flatnonzero(similarities >= SIMILARITY_THRESHOLD)
+    return keep[np.argsort(-score[keep], kind="stable")]
+
+# === RETRIEVAL → PROMPT ===
+def build_rag_prompt(query, collection):
+    """Return (prompt, metas, error); prompt is None and error is set when nothing relevant was found."""
+    query_embedding = get_model().encode(query)
     results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=TOP_K,
+        query_embeddings=[query_embedding.tolist()],
+        n_results=CANDIDATE_POOL,
         include=["documents", "metadatas", "embeddings"]
     )
 
-    if not results["documents"] or not results["documents"][0]:
-        return "❌ No relevant posts found.", []
-
-    docs = results["documents"][0]
-    metas = results["metadatas"][0]
-    doc_embeddings = results["embeddings"][0]
-
-    # 🔍 Cosine similarity function
-    def cosine_similarity(a, b):
-        return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
-
-    # ✅ Compute similarity between query and each document
-    similarities = [cosine_similarity(query_embedding, emb) for emb in doc_embeddings]
-
-    # ✅ Filter documents with a reasonable semantic threshold
-    threshold = 0.4
-    relevant_docs = [
-        (doc, meta) for doc, meta, sim in zip(docs, metas, similarities)
-        if sim >= threshold
-    ]
-
-    if not relevant_docs:
-        return "❌ No relevant LinkedIn posts were found for this topic.", []
-
-    filtered_docs, filtered_metas = zip(*relevant_docs)
+    ids = list(results["ids"][0])
+    docs = list(results["documents"][0])
+    metas = list(results["metadatas"][0])
+    embeddings = list(results["embeddings"][0])
+
+    # Hybrid: keyword hits outside the dense candidate pool join the re-rank too
+    bm25_ids = []
+    if RETRIEVAL_MODE == "hybrid":
+        bm25_ids = [doc_id for doc_id, _ in get_keyword_index(collection).search(query, k=CANDIDATE_POOL)]
+        extra = [doc_id for doc_id in bm25_ids if doc_id not in set(ids)]
+        if extra:
+            page = collection.get(ids=extra, include=["documents", "metadatas", "embeddings"])
+            ids += page["ids"]
+            docs += page["documents"]
+            metas += page["metadatas"]
+            embeddings += list(page["embeddings"])
+
+    if not docs:
+        return None, [], "❌ No relevant posts found."
+
+    order = rerank(query_embedding, embeddings, metas)
+
+    if not len(order):
+        return None, [], "❌ No relevant LinkedIn posts were found for this topic."
+
+    if bm25_ids:
+        # Fuse the semantic order with keyword rank; only candidates that passed the threshold
+        position = {ids[i]: i for i in order}
+        fused = reciprocal_rank_fusion([[ids[i] for i in order], [d for d in bm25_ids if d in position]])
+        order = [position[doc_id] for doc_id, _ in fused]
+
+    # Only the best-matching chunks of the TOP_K best posts go into the prompt
+    posts = best_chunks([(ids[i], docs[i], metas[i]) for i in order], TOP_K)
+    filtered_metas, filtered_docs = zip(*posts)
     urls = [meta.get("url", "") for meta in filtered_metas]
-    prompt = build_prompt(query, filtered_docs, urls)
+    return build_prompt(query, filtered_docs, urls), filtered_metas, None
+
+# === MAIN RAG FUNCTIONS ===
+def rag_answer(query, collection):
+    prompt, metas, error = build_rag_prompt(query, collection)
+    if error:
+        return error, []
     answer = ask_mistral(prompt)
-    return answer, filtered_metas
\ No newline at end of file
+    return answer, metas
+
+def rag_answer_stream(query, collection):
+    """Like rag_answer, but the answer is a generator of tokens (time-to-first-token latency)."""
+    prompt, metas, error = build_rag_prompt(query, collection)
+    if error:
+        return iter([error]), []
+    return ask_mistral_stream(prompt), metas
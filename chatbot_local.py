@@ -1,14 +1,13 @@
 # chatbot_local.py
 
 import os
-import chromadb
-from sentence_transformers import SentenceTransformer
-import subprocess
+from vector.registry import get_embedder, get_chroma_client
+from vector.llm_client import get_llm_client, LLMError
+from vector.embedding_backends import get_backend, check_collection_backend, EmbeddingMismatchError
+from vector.chunking import best_chunks
 import textwrap
 from rich.console import Console
 
-import shutil
-
 # === INIT ===
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 console = Console()
@@ -17,37 +16,26 @@ console = Console()
 CHROMA_DB_DIR = "./chroma_db"
 COLLECTION_NAME = "linkedin_posts"
 TOP_K = 3
+CANDIDATE_POOL = 12   # chunks fetched, grouped into the TOP_K best posts
 WRAP_WIDTH = 100
 
-# === INIT VECTOR DB + EMBEDDING MODEL ===
-model = SentenceTransformer("mixedbread-ai/mxbai-embed-large-v1")
-embedding_dim = model.get_sentence_embedding_dimension()
-
-
-
-# 💣 Delete the old DB directory to avoid dimension mismatch
-if os.path.exists(CHROMA_DB_DIR):
-  
+# === VECTOR DB + EMBEDDING MODEL (loaded on first use) ===
+EMBED_MODEL_NAME = "mixedbread-ai/mxbai-embed-large-v1"
 
- client = chromadb.PersistentClient(path=CHROMA_DB_DIR)
+def get_model():
+    return get_embedder(EMBED_MODEL_NAME)
 
-# 🆕 Recreate collection with correct embedding dimension (1024)
-collection = client.get_or_create_collection(COLLECTION_NAME)
-
-# Delete & recreate if dimension is wrong
+# Delete & recreate if the stored vectors come from another embedding backend/dimension
 def ensure_collection():
+    client = get_chroma_client(CHROMA_DB_DIR)
+    backend = get_backend(f"sentence-transformers:{EMBED_MODEL_NAME}")
+    collection = client.get_or_create_collection(COLLECTION_NAME)
     try:
-        collection = client.get_collection(COLLECTION_NAME)
-        test_vec = model.encode("test sentence")
-        if len(test_vec) != embedding_dim:
-            console.print(f"⚠️ [red]Embedding size mismatch. Recreating collection...[/red]")
-            client.delete_collection(COLLECTION_NAME)
-            return client.create_collection(COLLECTION_NAME)
-        return collection
-    except:
-        return client.create_collection(COLLECTION_NAME)
-
-collection = ensure_collection()
+        return check_collection_backend(collection, backend)
+    except EmbeddingMismatchError as e:
+        console.print(f"⚠️ [red]{e}. Recreating collection...[/red]")
+        client.delete_collection(COLLECTION_NAME)
+        return client.create_collection(COLLECTION_NAME, metadata=backend.spec())
 
 # === FORMAT POST METADATA FOR DISPLAY ===
 def format_doc(i, meta, doc):
@@ -62,7 +50,7 @@ def format_doc(i, meta, doc):
 # === BUILD RAG PROMPT FOR MISTRAL ===
 def build_prompt(query, docs, urls):
     context = "\n\n".join(
-        f"POST {i+1}:\n{textwrap.shorten(d, width=1000)}"
+        f"POST {i+1}:\n{d}"
         for i, d in enumerate(docs)
     )
     links = "\n".join(f"POST {i+1} → {url}" for i, url in enumerate(urls))
@@ -83,28 +71,27 @@ Instructions:
 {links if links else ""}
 """
 
-# === CALL LOCAL MISTRAL ===
+# === CALL LOCAL MISTRAL (streamed to the terminal) ===
 def ask_mistral(prompt):
+    console.print("\n🤖 [bold cyan]Mistral is thinking...[/bold cyan]\n")
+    console.print("💡 [bold yellow]Answer:[/bold yellow]\n")
+    parts = []
     try:
-        console.print("\n🤖 [bold cyan]Mistral is thinking...[/bold cyan]\n")
-        result = subprocess.run(
-            ["ollama", "run", "mistral"],
-            input=prompt.encode("utf-8"),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=60
-        )
-        output = result.stdout.decode("utf-8").strip()
-        if not output:
-            return "⚠️ Mistral returned no answer. Try rephrasing your question or restart Ollama."
-        return output
-    except subprocess.TimeoutExpired:
-        return "⚠️ Mistral took too long to respond."
-    except Exception as e:
+        for token in get_llm_client().stream(prompt):
+            parts.append(token)
+            print(token, end="", flush=True)
+        print()
+    except LLMError as e:
         return f"⚠️ Error calling Mistral: {e}"
 
+    output = "".join(parts).strip()
+    if not output:
+        return "⚠️ Mistral returned no answer. Try rephrasing your question or restart Ollama."
+    return output
+
 # === MAIN CHAT LOOP ===
 if __name__ == "__main__":
+    collection = ensure_collection()
     console.print("💬 [bold green]Ask your LinkedIn RAG chatbot anything[/bold green] (type 'exit' to quit)")
     while True:
         query = input("\n🧠 You: ").strip()
@@ -112,15 +99,17 @@ if __name__ == "__main__":
             console.print("👋 [bold red]Goodbye![/bold red]")
             break
 
-        query_embedding = model.encode(query).tolist()
+        query_embedding = get_model().encode(query).tolist()
         results = collection.query(
             query_embeddings=[query_embedding],
-            n_results=TOP_K,
+            n_results=CANDIDATE_POOL,
             include=["documents", "metadatas"]
         )
 
-        docs = results["documents"][0]
-        metadatas = results["metadatas"][0]
+        hits = zip(results["ids"][0], results["documents"][0], results["metadatas"][0])
+        posts = best_chunks(hits, TOP_K)
+        metadatas = [meta for meta, _ in posts]
+        docs = [context for _, context in posts]
 
         if not docs:
             console.print("❌ [bold red]No relevant posts found.[/bold red]")
@@ -133,9 +122,8 @@ if __name__ == "__main__":
         urls = [meta.get("url", "") for meta in metadatas]
         prompt = build_prompt(query, docs, urls)
         answer = ask_mistral(prompt)
-
-        console.print("\n💡 [bold yellow]Answer:[/bold yellow]\n")
-        console.print(textwrap.fill(answer, width=WRAP_WIDTH))
+        if answer.startswith("⚠️"):
+            console.print(answer)
 
         console.print("\n🔗 [bold green]Referenced Posts:[/bold green]")
         for i, url in enumerate(urls):
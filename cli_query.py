@@ -4,18 +4,27 @@
 import json
 import os
 from datetime import datetime
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
-import operator
+from vector.registry import get_embedder, get_chroma_collection
+from vector.embedding_backends import get_backend
+from vector.quantized_index import get_quantized_index
+from vector.bm25_index import get_bm25_index, fuse_hits
 
-# Initialize embedding model
+# Embedding model + ChromaDB (loaded lazily on first query)
 EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
-model = SentenceTransformer(EMBED_MODEL_NAME)
+CHROMA_DIR = ".chromadb_store"
+COLLECTION_NAME = "linkedin_posts"
 
-# ChromaDB client setup
-client = chromadb.Client(Settings(chroma_db_impl="duckdb", persist_directory=".chromadb_store"))
-collection = client.get_or_create_collection("linkedin_posts")
+# Optional read-only quantised index (vector/quantized_index.py) served instead of Chroma
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR")
+
+def get_collection():
+    # Stored vectors must come from the same model we encode with (checked on open)
+    backend = get_backend(f"sentence-transformers:{EMBED_MODEL_NAME}")
+    if VECTOR_INDEX_DIR:
+        return get_quantized_index(VECTOR_INDEX_DIR, backend=backend)
+    return get_chroma_collection(CHROMA_DIR, COLLECTION_NAME, legacy=True, backend=backend)
+
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector")  # vector | bm25 | hybrid
 
 # Log file for query history and feedback
 LOG_DIR = "./logs"
@@ -35,18 +44,26 @@ def log_query(query: str, results: list):
         with open(LOG_FILE, "a") as f:
             f.write(json.dumps(log_entry) + "\n")
 
-def search_query(query: str, top_k: int = 5, min_rank: float = 0.0, keyword_filter: str = None):
-    embedded = model.encode(query)
-    results = collection.query(
-        query_embeddings=[embedded],
-        n_results=top_k * 2,
-        where={"keyword": keyword_filter} if keyword_filter else {}
-    )
+def search_query(query: str, top_k: int = 5, min_rank: float = 0.0, keyword_filter: str = None, mode: str = "vector"):
+    """mode: "vector" (dense only), "bm25" (keywords only) or "hybrid" (reciprocal rank fusion of both)."""
+    collection = get_collection()
+    where = {"keyword": keyword_filter} if keyword_filter else {}
+
+    hits = []
+    if mode != "bm25":
+        embedded = get_embedder(EMBED_MODEL_NAME).encode(query)
+        results = collection.query(
+            query_embeddings=[embedded],
+            n_results=top_k * 2,
+            where=where
+        )
+        hits = list(zip(results["ids"][0], results["documents"][0], results["metadatas"][0]))
+    if mode != "vector":
+        bm25_hits = get_bm25_index(CHROMA_DIR, COLLECTION_NAME).search(query, k=top_k * 2)
+        hits = fuse_hits(collection, hits, bm25_hits, top_k * 2, where=where)
 
     matched = []
-    for i in range(len(results["ids"][0])):
-        doc = results["documents"][0][i]
-        metadata = results["metadatas"][0][i]
+    for _, doc, metadata in hits:
         if metadata.get("rankScore", 0) >= min_rank:
             matched.append({"document": doc, "metadata": metadata})
 
@@ -66,7 +83,7 @@ def cli():
             print("👋 Exiting.")
             break
 
-        results = search_query(q)
+        results = search_query(q, mode=RETRIEVAL_MODE)
         print("\n📄 Top Results:\n")
         for idx, res in enumerate(results, 1):
             print(f"[{idx}] Summary: {res['document'][:300]}...")
@@ -3,21 +3,35 @@
 
 import os
 import json
+import time
+from itertools import islice
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
 import hashlib
 import math
+from vector.ingest_manifest import IngestManifest, FileState, content_hash, manifest_path_for
+from vector.post_parser import TIMESTAMP_FIELD, to_epoch
+from vector.registry import get_embedder, get_chroma_collection
+from vector.embedding_backends import get_backend
+from vector.bm25_index import get_bm25_index
+from vector.post_catalog import CATALOG_DIR, iter_rows
 
-# Load local embedding model
+# Local embedding model + ChromaDB collection (loaded lazily on first use)
 EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
-model = SentenceTransformer(EMBED_MODEL_NAME)
-
-# Initialize ChromaDB client and collection
-client = chromadb.Client(Settings(chroma_db_impl="duckdb", persist_directory=".chromadb_store"))
+CHROMA_DIR = ".chromadb_store"
 COLLECTION_NAME = "linkedin_posts"
-collection = client.get_or_create_collection(COLLECTION_NAME)
+MANIFEST_PATH = manifest_path_for(CHROMA_DIR)
+BACKEND_SPEC = f"sentence-transformers:{EMBED_MODEL_NAME}"
+CATALOG_COLUMNS = ["path", "mtime", "filename", "url", "keyword", "scrapedAt",
+                   "engagementScore", "summary", "embedding", "embedding_backend"]
+
+def get_collection():
+    # Stored vectors must come from the same model we encode with (checked on open)
+    return get_chroma_collection(CHROMA_DIR, COLLECTION_NAME, legacy=True, backend=get_backend(BACKEND_SPEC))
+
+# === PIPELINE CONFIG ===
+ENCODE_BATCH_SIZE = int(os.getenv("ENCODE_BATCH_SIZE", 64))    # texts per model.encode batch
+UPSERT_CHUNK_SIZE = int(os.getenv("UPSERT_CHUNK_SIZE", 1024))  # docs per collection.upsert
+ENCODE_PROCESSES = int(os.getenv("ENCODE_PROCESSES", 0))       # >1 → multi-process encode pool
 
 def compute_rank_score(score: float) -> float:
     return min(1.0, math.log(score + 1) / 5) if score else 0.0
@@ -25,19 +39,35 @@ def compute_rank_score(score: float) -> float:
 def hash_id(text: str) -> str:
     return hashlib.sha256(text.encode()).hexdigest()[:16]
 
-def process_summaries(summary_dir: str):
+def with_epoch(metadata: dict) -> dict:
+    """Add TIMESTAMP_FIELD (epoch seconds of `timestamp`) so queries can range-filter by time."""
+    epoch = to_epoch(metadata.get("timestamp"))
+    if epoch is not None:
+        metadata[TIMESTAMP_FIELD] = epoch
+    return metadata
+
+def iter_summaries(summary_dir: str, manifest: IngestManifest, seen_paths: set, replaced_ids: set):
+    """
+    Lazily yield (doc_id, summary, metadata, state, None) for new or changed summary JSON
+    files. A file whose summary went empty adds its old doc ID to replaced_ids.
+    """
     for file in Path(summary_dir).glob("*.json"):
-        with open(file, 'r') as f:
-            data = json.load(f)
+        seen_paths.add(str(file))
+        changed = manifest.read_if_changed(str(file))
+        if changed is None:
+            continue
+
+        state, raw = changed
+        data = json.loads(raw)
 
         summary = data.get("summary")
         if not summary:
             print(f"⚠️ Skipping {file.name}: No summary found.")
+            previous_id = manifest.record_skipped(state)
+            if previous_id:
+                replaced_ids.add(previous_id)
             continue
 
-        doc_id = hash_id(data.get("url", file.name))
-        embedding = model.encode(summary)
-
         metadata = {
             "filename": file.name,
             "keyword": data.get("keyword"),
@@ -46,15 +76,145 @@ def process_summaries(summary_dir: str):
             "engagementScore": data.get("engagementScore", 0),
             "rankScore": compute_rank_score(data.get("engagementScore", 0))
         }
+        yield hash_id(data.get("url", file.name)), summary, with_epoch(metadata), state, None
+
+def catalog_key(catalog_dir: str, path: str) -> str:
+    """Manifest pseudo-path of a catalog row (the manifest is shared with summary files)."""
+    return f"{catalog_dir}::{path}"
+
+def iter_catalog(catalog_dir: str, manifest: IngestManifest, seen_paths: set, replaced_ids: set, where=None):
+    """
+    Lazily yield (doc_id, summary, metadata, state, embedding) for catalog rows whose
+    summary changed, reading only the columns needed here. Embeddings already in the
+    catalog are reused when they came from our model; otherwise embedding is None.
+    A row whose summary was cleared adds its old doc ID to replaced_ids.
+    """
+    for row in iter_rows(catalog_dir, CATALOG_COLUMNS, where=where):
+        key = catalog_key(catalog_dir, row["path"])
+        seen_paths.add(key)
+        summary = row["summary"]
+        if not summary:
+            entry = manifest.get(key)
+            if entry and entry.doc_id:
+                replaced_ids.add(manifest.record_skipped(FileState(key, row["mtime"], 0, content_hash(b""))))
+            continue
+
+        state = FileState(key, row["mtime"], len(summary), content_hash(summary.encode("utf-8")))
+        if not manifest.content_changed(state):
+            continue
+
+        metadata = {
+            "filename": row["filename"],
+            "keyword": row["keyword"],
+            "url": row["url"],
+            "timestamp": row["scrapedAt"].isoformat() if row["scrapedAt"] else None,
+            "engagementScore": row["engagementScore"] or 0,
+            "rankScore": compute_rank_score(row["engagementScore"] or 0)
+        }
+        embedding = row["embedding"] if row["embedding_backend"] == BACKEND_SPEC else None
+        yield hash_id(row["url"] or row["filename"]), summary, with_epoch(metadata), state, embedding
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+def encode_texts(texts, batch_size=ENCODE_BATCH_SIZE, pool=None):
+    model = get_embedder(EMBED_MODEL_NAME)
+    if pool is not None:
+        return model.encode_multi_process(texts, pool, batch_size=batch_size)
+    return model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+
+def embed_missing(summaries, embeddings, batch_size=ENCODE_BATCH_SIZE, pool=None):
+    """Fill the None entries of `embeddings` by encoding only those summaries."""
+    missing = [i for i, e in enumerate(embeddings) if e is None]
+    if missing:
+        encoded = encode_texts([summaries[i] for i in missing], batch_size=batch_size, pool=pool)
+        for i, e in zip(missing, encoded):
+            embeddings[i] = e.tolist()
+    return embeddings
+
+def push_records(make_records, is_prunable, batch_size: int = ENCODE_BATCH_SIZE,
+                 chunk_size: int = UPSERT_CHUNK_SIZE, processes: int = ENCODE_PROCESSES):
+    """
+    Upsert make_records(manifest, seen_paths, replaced_ids) in chunks, then forget manifest
+    paths that is_prunable(path) claims but the scan no longer saw, deleting their orphaned
+    vectors (and those of files that stopped yielding a summary).
+    """
+    model = get_embedder(EMBED_MODEL_NAME)
+    collection = get_collection()
+    bm25 = get_bm25_index(CHROMA_DIR, COLLECTION_NAME)
+    manifest = IngestManifest(MANIFEST_PATH)
+    seen_paths = set()
+    replaced_ids = set()
+    pool = model.start_multi_process_pool(["cpu"] * processes) if processes > 1 else None
+    total = 0
+    start = time.perf_counter()
+
+    try:
+        for chunk in chunked(make_records(manifest, seen_paths, replaced_ids), chunk_size):
+            for doc_id, _, _, state, _ in chunk:
+                previous = manifest.get(state.path)
+                if previous and previous.doc_id and previous.doc_id != doc_id:
+                    replaced_ids.add(previous.doc_id)
+
+            # Same URL twice in one chunk would make the bulk upsert fail; keep the last one
+            unique = list({doc_id: (doc_id, s, m, e) for doc_id, s, m, _, e in chunk}.values())
+            ids, summaries, metadatas, embeddings = map(list, zip(*unique))
+            embeddings = embed_missing(summaries, embeddings, batch_size=batch_size, pool=pool)
+
+            collection.upsert(
+                documents=summaries,
+                embeddings=embeddings,
+                ids=ids,
+                metadatas=metadatas
+            )
+            bm25.upsert(ids, summaries)
+            for doc_id, _, _, state, _ in chunk:
+                manifest.record(state, doc_id)
+            manifest.commit()
+
+            total += len(ids)
+            elapsed = time.perf_counter() - start
+            print(f"✅ Upserted {len(ids)} docs ({total} total, {total / elapsed:.1f} docs/sec)")
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+
+    removed_paths = {p for p in manifest.tracked_paths() if is_prunable(p) and p not in seen_paths}
+    replaced_ids |= manifest.forget(removed_paths)
+    orphaned = manifest.orphans(replaced_ids)
+    if orphaned:
+        collection.delete(ids=list(orphaned))
+        bm25.delete(orphaned)
+        print(f"🗑️ Removed {len(orphaned)} stale vectors")
+    manifest.close()
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed else 0.0
+    print(f"\n🎉 Done. {total} docs in {elapsed:.1f}s → {rate:.1f} docs/sec")
+    return {"docs": total, "seconds": elapsed, "docs_per_sec": rate}
+
+def process_summaries(summary_dir: str, **kwargs):
+    # Only prune files under this summary_dir; the manifest is shared across keyword dirs
+    return push_records(
+        lambda manifest, seen_paths, replaced_ids: iter_summaries(summary_dir, manifest, seen_paths, replaced_ids),
+        lambda path: Path(path).parent == Path(summary_dir),
+        **kwargs
+    )
 
-        collection.upsert(
-            documents=[summary],
-            embeddings=[embedding],
-            ids=[doc_id],
-            metadatas=[metadata]
-        )
-        print(f"✅ Inserted into ChromaDB: {file.name}")
+def process_catalog(catalog_dir: str = CATALOG_DIR, where=None, **kwargs):
+    """Push summaries from the post catalog; a filtered (partial) scan never prunes."""
+    prefix = catalog_key(catalog_dir, "")
+    return push_records(
+        lambda manifest, seen_paths, replaced_ids: iter_catalog(catalog_dir, manifest, seen_paths, replaced_ids, where),
+        lambda path: where is None and path.startswith(prefix),
+        **kwargs
+    )
 
 if __name__ == "__main__":
-    SUMMARY_JSON_DIR = "./data/summaries/ai-startup"   # Update for each keyword
-    process_summaries(SUMMARY_JSON_DIR)
\ No newline at end of file
+    if CATALOG_DIR:
+        process_catalog(CATALOG_DIR)
+    else:
+        SUMMARY_JSON_DIR = "./data/summaries/ai-startup"   # Update for each keyword
+        process_summaries(SUMMARY_JSON_DIR)
@@ -5,7 +5,12 @@ import os
 import json
 from chromadb import Client
 from chromadb.config import Settings
-from ollama import chat_with_mistral  # Assuming you have ollama setup
+from vector.chat_with_mistral import chat_with_mistral  # pooled Ollama client
+from vector.chroma_scan import iter_collection
+from vector.topk import TopKPerKey
+from vector.chunking import load_full_posts
+from vector.post_catalog import CATALOG_DIR, rank_by_category, load_rows
+from vector.time_window import resolve_window, and_where, chroma_window_where, catalog_window_where, describe_window
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,18 +20,24 @@ client = Client(Settings(persist_directory=CHROMA_PATH))
 collection = client.get_collection(name="linkedin-posts")
 
 # ---- Utility Functions ---- #
-def group_posts_by_category(docs):
-    grouped = {}
-    for doc in docs:
-        cat = doc['metadata'].get('category', 'Uncategorized')
-        grouped.setdefault(cat, []).append(doc)
-    return grouped
+def engagement(metadata):
+    try:
+        return float(metadata.get('engagementScore', 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
 
-def rank_posts(posts):
-    return sorted(posts, key=lambda x: x['metadata'].get('engagementScore', 0), reverse=True)
+def rank_posts_by_category(records, top_n=5):
+    """Stream (id, _, metadata) records into a bounded top_n ranker per category (ids + scores only)."""
+    ranker = TopKPerKey(top_n)
+    for doc_id, _, metadata in records:
+        if metadata.get('chunk_index', 0):
+            continue  # one entry per post: rank its first chunk
+        ranker.push(metadata.get('category', 'Uncategorized'), engagement(metadata), doc_id)
+    return ranker
 
 def summarize_category(category, posts, top_n=5):
-    content_blocks = [p['document'] for p in rank_posts(posts)[:top_n]]
+    """`posts` are the category's winners, best first."""
+    content_blocks = [p['document'] for p in posts[:top_n]]
     merged = "\n---\n".join(content_blocks)
     prompt = f"""
 You are an AI analyst. Extract weekly insights from the following high-engagement LinkedIn posts in the category: "{category}".
@@ -41,20 +52,38 @@ Posts:
 
 Summarize in 5-7 bullet points.
 """
-    return chat_with_mistral(prompt)
+    # Unchanged top posts → identical prompt → served from the LLM response cache
+    return chat_with_mistral(prompt, use_cache=True)
+
+def load_ranked_posts(categories, window, top_n):
+    """(ranker, {id: (document, metadata)}) for the top_n posts per category scraped within window."""
+    category_where = {"category": {"$in": list(categories)}} if categories else None
+    if CATALOG_DIR:
+        # Columnar catalog: rank on path/category/score columns only, then read the winners' bodies
+        where = and_where(category_where, catalog_window_where(*window))
+        ranker = rank_by_category(CATALOG_DIR, top_n, where=where)
+        rows = load_rows(CATALOG_DIR, "path", ranker.winner_ids(), ["body", "url", "category", "engagementScore"])
+        return ranker, {path: (row["body"] or "", row) for path, row in rows.items()}
+    where = and_where(category_where, chroma_window_where(*window))  # time range pushed down to Chroma
+    records = iter_collection(collection, where=where, include=["metadatas"])
+    ranker = rank_posts_by_category(records, top_n)
+    return ranker, load_full_posts(collection, ranker.winner_ids())  # chunks reassembled into whole posts
 
 # ---- Main Logic ---- #
-def generate_insight_digest():
-    results = collection.get(include=["documents", "metadatas"])
-    grouped = group_posts_by_category([
-        {"document": d, "metadata": m}
-        for d, m in zip(results["documents"], results["metadatas"])
-    ])
+def generate_insight_digest(categories=None, top_n=5, since=None, until=None, days=None):
+    """Digest of posts scraped in [since, until] (or the last `days`; default DIGEST_WINDOW_DAYS)."""
+    window = resolve_window(since, until, days)
+    print(f"🗓️ Window: {describe_window(*window)}")
+    ranker, winners = load_ranked_posts(categories, window, top_n)
 
     insight_digest = {}
-    for category, posts in grouped.items():
-        print(f"🔍 Generating insight for category: {category} ({len(posts)} posts)")
-        summary = summarize_category(category, posts)
+    for category in ranker.keys():
+        posts = [
+            {"document": winners[doc_id][0], "metadata": winners[doc_id][1]}
+            for _, doc_id in ranker.top(category)
+        ]
+        print(f"🔍 Generating insight for category: {category} ({ranker.counts[category]} posts)")
+        summary = summarize_category(category, posts, top_n)
         insight_digest[category] = summary
 
     with open("weekly_insights.json", "w") as f:
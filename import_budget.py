@@ -0,0 +1,67 @@
+# import_budget.py
+# Measures the cold import time of each Python entry point in a fresh interpreter
+# and checks it against a budget. Models and Chroma clients are loaded lazily
+# through vector/registry.py, so importing an entry point must never pull in
+# torch / sentence-transformers / chromadb.
+#
+# Usage: python import_budget.py        (exit code 1 if any budget is exceeded)
+
+import json
+import subprocess
+import sys
+
+# Budgets in milliseconds (cold import, measured on a laptop-class CPU)
+ENTRY_POINT_BUDGETS_MS = {
+    "chatbot_core": 400,
+    "chatbot_local": 600,     # rich
+    "cli_query": 400,
+    "query_api": 1200,        # fastapi + pydantic + uvicorn
+    "embed_and_push": 400,
+    "summarizer": 400,
+}
+
+# Heavy modules that must only be imported on first real use
+LAZY_ONLY = ["torch", "transformers", "sentence_transformers", "chromadb"]
+
+PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+ms = (time.perf_counter() - t) * 1000
+print(json.dumps({{"ms": ms, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module):
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=LAZY_ONLY)],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    failed = False
+    print(f"{'entry point':<16} {'import ms':>10} {'budget':>8}  status")
+    for module, budget in ENTRY_POINT_BUDGETS_MS.items():
+        result = measure(module)
+        if "error" in result:
+            print(f"{module:<16} {'-':>10} {budget:>8}  ⚠️ {result['error']}")
+            failed = True
+            continue
+
+        status = "✅"
+        if result["heavy"]:
+            status = f"❌ eagerly imports {', '.join(result['heavy'])}"
+        elif result["ms"] > budget:
+            status = "❌ over budget"
+        failed |= status != "✅"
+        print(f"{module:<16} {result['ms']:>10.0f} {budget:>8}  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import chromadb
+from itertools import islice
+from vector.chroma_scan import iter_collection
 
 
 client = chromadb.PersistentClient(path="./chroma_db")  # or use absolute path
@@ -6,9 +8,9 @@ collection = client.get_or_create_collection("linkedin_posts")
 
 print(f"📦 Total documents: {collection.count()}")
 
-results = collection.get(include=["metadatas", "documents"])
-for i in range(min(3, len(results['ids']))):
+# Only the first three are printed, so only fetch three
+for i, (_, doc, meta) in enumerate(islice(iter_collection(collection, page_size=3), 3)):
     print(f"\n🧠 Document {i+1}")
-    print("🔗 URL:", results["metadatas"][i].get("url"))
-    print("📎 Keyword:", results["metadatas"][i].get("keyword"))
-    print("📝 Snippet:", results["documents"][i][:300], "...")
\ No newline at end of file
+    print("🔗 URL:", meta.get("url"))
+    print("📎 Keyword:", meta.get("keyword"))
+    print("📝 Snippet:", doc[:300], "...")
@@ -1,25 +1,216 @@
+# ocr_helper.py
+# OCR for scraped slide images.
+#
+#   python3 ocr_helper.py <image_path>   → one-shot, writes <image_path>.txt
+#   python3 ocr_helper.py --serve        → long-lived JSON-lines worker
+#
+# Worker protocol (one JSON object per line):
+#   stdin : {"id": 1, "paths": ["/tmp/a.png", "/tmp/b.jpg"]}
+#   stdout: {"id": 1, "results": [{"path": "/tmp/a.png", "text": "...", "error": null, "cached": false}, ...]}
+#
+# Preprocessing: resize to OCR_TARGET_DPI → adaptive threshold (dark slides inverted
+# first) → crop to the detected text blocks. The perceptual hash of that cleaned-up
+# image keys a local SQLite cache, so repeated slides (reposts, shared templates with
+# the same text) are never sent to tesseract twice; blank slides are skipped.
+
+import os
+
+# Each pool worker runs its own tesseract; keep tesseract single-threaded so
+# N workers on N cores don't oversubscribe the CPU.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+import sys
+import json
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import cv2
+import numpy as np
 import pytesseract
-import sys
-import os
-import sys, os
 from PIL import Image
 
+# === CONFIG ===
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", 300))
+OCR_MIN_REAL_DPI = 150                # below this (72/96 defaults) the DPI tag is meaningless for screen images
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", 2000))   # cap after DPI scaling (huge carousel exports)
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", ".ocr_cache.sqlite")
+OCR_PHASH_MAX_DISTANCE = int(os.getenv("OCR_PHASH_MAX_DISTANCE", 0))  # bits; 0 = exact match only
+PHASH_SIZE = 16                       # 16×16 difference hash → 256 bits, fine enough to tell slide texts apart
+MIN_TEXT_BLOCK_AREA = 200             # px² after scaling; smaller blobs are noise
+MIN_INK_FRACTION = 0.002              # share of dark pixels below which a slide counts as blank
+
+
+# === PREPROCESSING ===
+def load_grayscale(image_path):
+    """Grayscale pixels plus the image's DPI; screen images are taken to be at OCR_TARGET_DPI already."""
+    with Image.open(image_path) as img:
+        dpi = float(img.info.get("dpi", (0,))[0] or 0)
+        return np.array(img.convert("L")), dpi if dpi >= OCR_MIN_REAL_DPI else float(OCR_TARGET_DPI)
+
+
+def resize_to_dpi(gray, dpi):
+    scale = OCR_TARGET_DPI / dpi
+    scale = min(scale, OCR_MAX_SIDE / max(gray.shape))
+    if abs(scale - 1) < 0.05:
+        return gray
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interpolation)
+
+
+def binarize(gray):
+    """Black text on white. Light-on-dark slides are inverted so their text survives the threshold."""
+    if np.median(gray) < 128:
+        gray = 255 - gray
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+
+
+def crop_to_text(binary, margin=10):
+    """
+    Crop to the bounding box of text-like blocks (letters dilated into lines). RETR_LIST
+    also finds blocks nested inside a slide's frame or panel; if none survive the filters
+    the whole image is kept. None only for (nearly) blank images.
+    """
+    ink = 255 - binary
+    if cv2.countNonZero(ink) < ink.size * MIN_INK_FRACTION:
+        return None
+    blocks = cv2.dilate(ink, cv2.getStructuringElement(cv2.MORPH_RECT, (25, 7)))
+    contours, _ = cv2.findContours(blocks, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = [cv2.boundingRect(c) for c in contours]
+    boxes = [(x, y, w, h) for x, y, w, h in boxes if w * h >= MIN_TEXT_BLOCK_AREA and h < binary.shape[0] * 0.9]
+    if not boxes:
+        return binary
+    x0 = max(min(x for x, _, _, _ in boxes) - margin, 0)
+    y0 = max(min(y for _, y, _, _ in boxes) - margin, 0)
+    x1 = min(max(x + w for x, _, w, _ in boxes) + margin, binary.shape[1])
+    y1 = min(max(y + h for _, y, _, h in boxes) + margin, binary.shape[0])
+    return np.ascontiguousarray(binary[y0:y1, x0:x1])
+
+
 def preprocess_image(image_path):
-    img = cv2.imread(image_path)
-    if img is None:
-        raise ValueError(f"Could not load image: {image_path}")
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    return gray
+    """Resized, binarised, text-cropped image ready for tesseract, or None for a blank image."""
+    gray, dpi = load_grayscale(image_path)
+    return crop_to_text(binarize(resize_to_dpi(gray, dpi)))
 
-def extract_text_from_image(image_path):
+
+# === PERCEPTUAL-HASH OCR CACHE ===
+def perceptual_hash(image):
+    """Difference hash of the preprocessed image as a hex string."""
+    small = cv2.resize(image, (PHASH_SIZE + 1, PHASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return np.packbits(bits).tobytes().hex()
+
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+class OCRCache:
+    def __init__(self, path=OCR_CACHE_PATH):
+        # Every pool worker opens its own connection; WAL + busy timeout let them share the file
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_results (
+                phash TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                created REAL NOT NULL
+            )
+        """)
+        self.conn.create_function("hamming", 2, hamming, deterministic=True)
+        self.conn.commit()
+
+    def get(self, phash):
+        row = self.conn.execute("SELECT text FROM ocr_results WHERE phash = ?", (phash,)).fetchone()
+        if row is None and OCR_PHASH_MAX_DISTANCE:
+            row = self.conn.execute(
+                "SELECT text FROM ocr_results WHERE hamming(phash, ?) <= ? LIMIT 1",
+                (phash, OCR_PHASH_MAX_DISTANCE),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, phash, text):
+        self.conn.execute("INSERT OR REPLACE INTO ocr_results (phash, text, created) VALUES (?, ?, ?)",
+                          (phash, text, time.time()))
+        self.conn.commit()
+
+
+_cache = None
+
+def get_ocr_cache():
+    global _cache
+    if _cache is None:
+        _cache = OCRCache()
+    return _cache
+
+
+def verify_image(image_path):
+    if not os.path.exists(image_path):
+        raise FileNotFoundError(f"Image not found: {image_path}")
+    with Image.open(image_path) as img:
+        img.verify()  # Check if it's a valid image
+
+
+def ocr_image(image_path):
+    """→ (text, cached). Blank slides and cache hits never reach tesseract."""
     preprocessed = preprocess_image(image_path)
+    if preprocessed is None:
+        return "", False
+
+    cache = get_ocr_cache()
+    phash = perceptual_hash(preprocessed)
+    text = cache.get(phash)
+    if text is not None:
+        return text, True
     text = pytesseract.image_to_string(preprocessed)
-    return text
+    cache.put(phash, text)
+    return text, False
+
+
+def extract_text_from_image(image_path):
+    return ocr_image(image_path)[0]
+
+
+def _ocr_one(image_path):
+    try:
+        verify_image(image_path)
+        text, cached = ocr_image(image_path)
+        return {"path": image_path, "text": text, "error": None, "cached": cached}
+    except Exception as e:
+        return {"path": image_path, "text": "", "error": str(e), "cached": False}
+
+
+# === LONG-LIVED WORKER ===
+def serve(stdin=sys.stdin, stdout=sys.stdout, workers=OCR_WORKERS):
+    """Answer OCR batches from stdin until EOF, reusing one process pool."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        stdout.write(json.dumps({"ready": True, "workers": workers}) + "\n")
+        stdout.flush()
+
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                paths = request.get("paths", [])
+                results = list(pool.map(_ocr_one, paths))
+                response = {"id": request.get("id"), "results": results}
+            except Exception as e:
+                response = {"id": None, "error": f"Bad request: {e}"}
+
+            stdout.write(json.dumps(response) + "\n")
+            stdout.flush()
+
 
 if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "--serve":
+        serve()
+        sys.exit(0)
+
     if len(sys.argv) != 2:
-        print("Usage: python ocr_helper.py <image_path>")
+        print("Usage: python ocr_helper.py <image_path> | --serve")
         sys.exit(1)
 
     path = sys.argv[1]
@@ -27,23 +218,11 @@ if __name__ == "__main__":
         print(f"❌ Image not found: {path}")
         sys.exit(1)
 
-    try:
-        text = extract_text_from_image(path)
-        with open(path + '.txt', 'w') as f:
-            f.write(text)
-        print(f"✅ OCR done for {path}")
-    except Exception as e:
-        print(f"❌ OCR failed for {path}: {e}")
+    result = _ocr_one(path)
+    if result["error"]:
+        print(f"❌ OCR failed for {path}: {result['error']}")
         sys.exit(1)
 
-        path = sys.argv[1]
-if not os.path.exists(path):
-    print("OCR ERROR: file does not exist.")
-    sys.exit(1)
-
-try:
-    img = Image.open(path)
-    img.verify()  # Check if it's a valid image
-except Exception as e:
-    print("OCR ERROR: Could not load image:", e)
-    sys.exit(1)
\ No newline at end of file
+    with open(path + '.txt', 'w') as f:
+        f.write(result["text"])
+    print(f"✅ OCR done for {path}")
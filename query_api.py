@@ -1,22 +1,38 @@
 # query_api.py
 # Provides a FastAPI interface to query ChromaDB with semantic + metadata ranking
 
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
+from vector.registry import get_embedder, get_chroma_collection
+from vector.embedding_backends import get_backend
+from vector.micro_batcher import MicroBatcher
+from vector.quantized_index import get_quantized_index
+from vector.bm25_index import get_bm25_index, fuse_hits, RETRIEVAL_MODES
 import uvicorn
 from typing import List, Optional
+from collections import defaultdict
+import json
 import operator
+import os
 
-# Load embedding model
+# Embedding model + ChromaDB (loaded lazily on first request)
 EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
-model = SentenceTransformer(EMBED_MODEL_NAME)
+CHROMA_DIR = ".chromadb_store"
+COLLECTION_NAME = "linkedin_posts"
 
-# ChromaDB setup
-client = chromadb.Client(Settings(chroma_db_impl="duckdb", persist_directory=".chromadb_store"))
-collection = client.get_or_create_collection("linkedin_posts")
+# Optional read-only quantised index (vector/quantized_index.py) served instead of Chroma
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR")
+
+def get_collection():
+    # Stored vectors must come from the same model we encode with (checked on open)
+    backend = get_backend(f"sentence-transformers:{EMBED_MODEL_NAME}")
+    if VECTOR_INDEX_DIR:
+        return get_quantized_index(VECTOR_INDEX_DIR, backend=backend)
+    return get_chroma_collection(CHROMA_DIR, COLLECTION_NAME, legacy=True, backend=backend)
+
+# Micro-batching: concurrent /search requests share one encode + one query per batch
+BATCH_MAX_SIZE = int(os.getenv("SEARCH_BATCH_MAX_SIZE", 32))
+BATCH_MAX_WAIT_MS = float(os.getenv("SEARCH_BATCH_MAX_WAIT_MS", 5))
 
 app = FastAPI(title="Semantic Research Assistant")
 
@@ -28,25 +44,61 @@ class SearchResult(BaseModel):
     rankScore: Optional[float] = None
     timestamp: Optional[str] = None
 
+def search_batch(requests):
+    """
+    Encode every dense query in one call, then run one multi-query lookup per
+    (n_results, where) group. "bm25"/"hybrid" requests add a keyword search
+    fused with the vector hits by reciprocal rank.
+    """
+    dense = [i for i, r in enumerate(requests) if r["mode"] != "bm25"]
+    embeddings = get_embedder(EMBED_MODEL_NAME).encode([requests[i]["q"] for i in dense]) if dense else []
+
+    groups = defaultdict(list)
+    for row, i in enumerate(dense):
+        r = requests[i]
+        groups[(r["n_results"], json.dumps(r["where"], sort_keys=True))].append((row, i))
+
+    vector_hits = [[] for _ in requests]
+    collection = get_collection()
+    for (n_results, where), members in groups.items():
+        results = collection.query(
+            query_embeddings=[embeddings[row].tolist() for row, _ in members],
+            n_results=n_results,
+            where=json.loads(where)
+        )
+        for k, (_, i) in enumerate(members):
+            vector_hits[i] = list(zip(results["ids"][k], results["documents"][k], results["metadatas"][k]))
+
+    out = []
+    for r, hits in zip(requests, vector_hits):
+        if r["mode"] != "vector":
+            bm25_hits = get_bm25_index(CHROMA_DIR, COLLECTION_NAME).search(r["q"], k=r["n_results"])
+            hits = fuse_hits(collection, hits, bm25_hits, r["n_results"], where=r["where"])
+        out.append([(doc, meta) for _, doc, meta in hits])
+    return out
+
+batcher = MicroBatcher(search_batch, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS)
+
 @app.get("/search", response_model=List[SearchResult])
-def search(
+async def search(
     q: str = Query(..., description="Your query/question"),
     top_k: int = 5,
     keyword_filter: Optional[str] = None,
-    min_rank: float = 0.0
+    min_rank: float = 0.0,
+    mode: str = Query("vector", description="Retrieval mode: vector, bm25 or hybrid")
 ):
-    embedded_query = model.encode(q)
+    if mode not in RETRIEVAL_MODES:
+        raise HTTPException(status_code=422, detail=f"mode must be one of {RETRIEVAL_MODES}")
 
-    results = collection.query(
-        query_embeddings=[embedded_query],
-        n_results=top_k * 2,  # fetch more to filter later
-        where={"keyword": keyword_filter} if keyword_filter else {}
-    )
+    hits = await batcher.submit({
+        "q": q,
+        "mode": mode,
+        "n_results": top_k * 2,  # fetch more to filter later
+        "where": {"keyword": keyword_filter} if keyword_filter else {}
+    })
 
     matched = []
-    for i in range(len(results["ids"][0])):
-        metadata = results["metadatas"][0][i]
-        doc = results["documents"][0][i]
+    for doc, metadata in hits:
         if metadata.get("rankScore", 0) >= min_rank:
             matched.append(SearchResult(summary=doc, **metadata))
 
@@ -54,5 +106,14 @@ def search(
     matched.sort(key=operator.attrgetter("rankScore"), reverse=True)
     return matched[:top_k]
 
+@app.get("/metrics")
+async def metrics():
+    """Rolling p50/p95/p99 latency (ms), throughput and average batch size for /search."""
+    return batcher.stats.snapshot()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await batcher.stop()
+
 if __name__ == "__main__":
-    uvicorn.run("query_api:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("query_api:app", host="0.0.0.0", port=8000, reload=True)
@@ -15,6 +15,7 @@ import mime from 'mime-types';
 import { uploadFilesToDrive } from './uploadFilesToDrive.js'; // adjust path if needed
 import { mistralChat } from './mistralClient.js';
 import { classifyPost } from './utils/categorizer.js';
+import { ocrImages, stopOcrWorker } from './utils/ocrWorker.js';
 
 
 // Load list of research authors
@@ -288,6 +289,7 @@ async function extractOCRFromPostImages(post, folderPath, filenameSafe) {
 
   let ocrText = '';
   const ocrFailures = [];
+  const ocrQueue = [];
 
   for (let i = 0; i < images.length; i++) {
     const imgUrl = images[i];
@@ -318,25 +320,31 @@ async function extractOCRFromPostImages(post, folderPath, filenameSafe) {
         continue;
       }
 
-      const command = `python3 ocr_helper.py "${tempPath}"`;
-      try {
-        execSync(command, { stdio: 'pipe' });
-        const ocrResultPath = tempPath + '.txt';
-        if (fs.existsSync(ocrResultPath)) {
-          const text = fs.readFileSync(ocrResultPath, 'utf-8').trim();
-          if (text.length > 30) ocrText += `\n[Image ${i + 1}]\n${text}\n`;
-          fs.unlinkSync(ocrResultPath);
-        }
-      } catch (err) {
-        console.warn(`❌ OCR failed for ${tempPath}: ${err.message}`);
-        ocrFailures.push(tempPath);
-      }
+      ocrQueue.push({ index: i, tempPath });
     } catch (err) {
       console.warn(`⚠️ Image OCR failed for ${imgUrl}:`, err.message);
       ocrFailures.push(imgUrl);
     }
   }
 
+  // One batch per post through the persistent OCR worker
+  try {
+    const results = await ocrImages(ocrQueue.map(q => q.tempPath));
+    results.forEach((res, j) => {
+      const { index, tempPath } = ocrQueue[j];
+      if (res.error) {
+        console.warn(`❌ OCR failed for ${tempPath}: ${res.error}`);
+        ocrFailures.push(tempPath);
+        return;
+      }
+      const text = (res.text || '').trim();
+      if (text.length > 30) ocrText += `\n[Image ${index + 1}]\n${text}\n`;
+    });
+  } catch (err) {
+    console.warn(`❌ OCR worker failed: ${err.message}`);
+    ocrFailures.push(...ocrQueue.map(q => q.tempPath));
+  }
+
   return {
     ocrText: ocrText.trim(),
     ocrExtracted: !!ocrText.trim(),
@@ -1152,4 +1160,5 @@ async function main() {
 
 
 console.log(`🟢 Starting scrape with ${SEED_CONFIG.length} seed configurations...`);
-main();
\ No newline at end of file
+// Always close the OCR worker's stdin, or its process keeps Node alive after a failed run
+main().finally(stopOcrWorker);
\ No newline at end of file
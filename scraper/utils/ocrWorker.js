@@ -0,0 +1,70 @@
+// ocrWorker.js
+// Keeps one `python3 ocr_helper.py --serve` process alive for the whole crawl
+// and sends it batches of image paths over stdin/stdout (JSON lines).
+// If the worker can't start or dies, pending and later batches reject with that
+// error, so callers record the images as OCR failures instead of hanging.
+import { spawn } from 'child_process';
+import readline from 'readline';
+
+let worker = null;
+let ready = null;
+let failure = null; // set once the worker failed; it is not restarted
+let nextId = 1;
+const pending = new Map();
+
+function startWorker() {
+  worker = spawn('python3', ['ocr_helper.py', '--serve'], { stdio: ['pipe', 'pipe', 'inherit'] });
+
+  ready = new Promise((resolve, reject) => {
+    const fail = err => {
+      if (!failure) failure = err;
+      reject(failure);
+      for (const job of pending.values()) job.reject(failure);
+      pending.clear();
+      worker = null;
+    };
+
+    const rl = readline.createInterface({ input: worker.stdout });
+    rl.on('line', line => {
+      let msg;
+      try {
+        msg = JSON.parse(line);
+      } catch {
+        return; // ignore stray prints
+      }
+      if (msg.ready) return resolve();
+
+      const job = pending.get(msg.id);
+      if (!job) return;
+      pending.delete(msg.id);
+      msg.error ? job.reject(new Error(msg.error)) : job.resolve(msg.results);
+    });
+
+    // 'error' fires when python3 can't be spawned (no 'exit' follows) or stdin breaks
+    worker.on('error', err => fail(new Error(`OCR worker failed: ${err.message}`)));
+    worker.stdin.on('error', err => fail(new Error(`OCR worker stdin failed: ${err.message}`)));
+    worker.on('exit', (code, signal) => fail(new Error(`OCR worker exited with ${signal || `code ${code}`}`)));
+  });
+  ready.catch(() => {}); // rejection is surfaced through ocrImages()
+}
+
+// Returns [{ path, text, error }] in the same order as `paths`.
+export async function ocrImages(paths) {
+  if (!paths.length) return [];
+  if (failure) throw failure;
+  if (!worker) startWorker();
+  await ready;
+  if (!worker) throw failure;
+
+  const id = nextId++;
+  return new Promise((resolve, reject) => {
+    pending.set(id, { resolve, reject });
+    worker.stdin.write(JSON.stringify({ id, paths }) + '\n');
+  });
+}
+
+export function stopOcrWorker() {
+  if (!worker) return;
+  failure = failure || new Error('OCR worker stopped');
+  worker.stdin.end();
+}
@@ -8,52 +8,138 @@ from pathlib import Path
 # Choose the local model interface you prefer: `llama-cpp`, `transformers`, or `ollama`
 # Below is a `transformers`-based example for Mistral
 
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
-import torch
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Load model only once
-MODEL_NAME = "mistralai/Mistral-7B-Instruct-v0.2"
-device = "cuda" if torch.cuda.is_available() else "cpu"
-
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForCausalLM.from_pretrained(MODEL_NAME, torch_dtype=torch.float16 if device == "cuda" else torch.float32).to(device)
-gen_pipeline = pipeline("text-generation", model=model, tokenizer=tokenizer, device=0 if device == "cuda" else -1)
+from vector.registry import get_or_create
+from vector.llm_cache import get_llm_cache
+from vector.llm_client import get_llm_client, LLM_MAX_CONCURRENCY
 
-def summarize(text: str, max_tokens: int = 512) -> str:
-    prompt = f"""You are a helpful summarizer. Summarize the following content into 3-5 short bullet points:
+MODEL_NAME = "mistralai/Mistral-7B-Instruct-v0.2"
 
-{text.strip()[:3000]}
+# === BATCHED SUMMARISATION CONFIG ===
+SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", "transformers")   # transformers | ollama
+SUMMARY_QUANTIZE = os.getenv("SUMMARY_QUANTIZE", "")             # "int8" → dynamic int8 Linear layers on CPU
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", 8))     # prompts per generate() call
+MAX_INPUT_CHARS = 3000
+
+def _load_pipeline():
+    from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+    import torch
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    # Batched causal generation pads on the left; Mistral ships without a pad token
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    model = AutoModelForCausalLM.from_pretrained(MODEL_NAME, torch_dtype=torch.float16 if device == "cuda" else torch.float32).to(device)
+    if device == "cpu":
+        torch.set_num_threads(os.cpu_count() or 1)
+        if SUMMARY_QUANTIZE == "int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("text-generation", model=model, tokenizer=tokenizer, device=0 if device == "cuda" else -1)
+
+# Load model only once, on first summarize() call
+def get_pipeline():
+    return get_or_create(("hf-text-generation", MODEL_NAME, SUMMARY_QUANTIZE), _load_pipeline)
+
+def build_prompt(text: str) -> str:
+    return f"""You are a helpful summarizer. Summarize the following content into 3-5 short bullet points:
+
+{text.strip()[:MAX_INPUT_CHARS]}
 
 Summary:"""
 
-    output = gen_pipeline(prompt, max_new_tokens=max_tokens, do_sample=False, temperature=0.7)[0]['generated_text']
-
-    # Trim and clean up output
+def clean_summary(output: str) -> str:
     summary_start = output.find("Summary:")
-    summary = output[summary_start + len("Summary:"):].strip() if summary_start != -1 else output.strip()
-    return summary
+    return output[summary_start + len("Summary:"):].strip() if summary_start != -1 else output.strip()
+
+def _generate_transformers(prompts, max_tokens):
+    """One padded generate() per call; cached prompts never reach the model."""
+    cache = get_llm_cache()
+    params = {"max_new_tokens": max_tokens, "do_sample": False, "return_full_text": False}
+    results = [cache.get(MODEL_NAME, p, params) for p in prompts]
+    misses = [i for i, r in enumerate(results) if r is None]
+    if misses:
+        outputs = get_pipeline()([prompts[i] for i in misses], batch_size=len(misses), **params)
+        for i, output in zip(misses, outputs):
+            results[i] = output[0]["generated_text"]
+            if results[i]:
+                cache.put(MODEL_NAME, prompts[i], results[i], params)
+    return results
+
+def _generate_ollama(prompts, max_tokens):
+    """Concurrent requests; the shared client bounds in-flight calls and caches responses."""
+    client = get_llm_client()
+    options = {"num_predict": max_tokens, "temperature": 0}
+    with ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY) as pool:
+        return list(pool.map(lambda p: client.generate(p, options=options, use_cache=True), prompts))
+
+def summarize_batch(texts, max_tokens: int = 512, backend: str = SUMMARY_BACKEND):
+    prompts = [build_prompt(text) for text in texts]
+    generate = _generate_ollama if backend == "ollama" else _generate_transformers
+    return [clean_summary(output) for output in generate(prompts, max_tokens)]
 
-def process_directory(input_dir: str, output_dir: str, metadata_path: str):
+def summarize(text: str, max_tokens: int = 512) -> str:
+    return summarize_batch([text], max_tokens)[0]
+
+def _write_json(path: Path, data):
+    # Write-then-rename: an interrupted run never leaves a truncated summary behind
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, 'w') as out:
+        json.dump(data, out, indent=2)
+    os.replace(tmp, path)
+
+def process_directory(input_dir: str, output_dir: str, metadata_path: str,
+                      batch_size: int = SUMMARY_BATCH_SIZE, backend: str = SUMMARY_BACKEND, force: bool = False):
+    """
+    Summarise every .txt in input_dir into output_dir/<name>.json. Files whose summary is
+    newer than the input are skipped (only their metadata is refreshed if it changed), the
+    rest run in length-sorted batches and are written as each batch finishes, so an
+    interrupted run resumes where it stopped.
+    """
     os.makedirs(output_dir, exist_ok=True)
     with open(metadata_path, 'r') as f:
         metadata_map = json.load(f)  # assumes dict: {filename: metadata}
 
+    pending = []
+    skipped = 0
     for file in Path(input_dir).glob("*.txt"):
+        out_path = Path(output_dir) / file.with_suffix('.json').name
+        metadata = metadata_map.get(file.name, {})
+        if not force and out_path.exists() and out_path.stat().st_mtime >= file.stat().st_mtime:
+            with open(out_path, 'r') as f:
+                existing = json.load(f)
+            updated = {"summary": existing.get("summary", ""), **metadata}
+            if updated != existing:
+                _write_json(out_path, updated)
+            skipped += 1
+            continue
         with open(file, 'r') as f:
-            content = f.read()
-
-        filename = file.name
-        summary = summarize(content)
-
-        metadata = metadata_map.get(filename, {})
-        output = {
-            "summary": summary,
-            **metadata
-        }
-
-        with open(Path(output_dir) / file.with_suffix('.json').name, 'w') as out:
-            json.dump(output, out, indent=2)
-        print(f"✅ Summarized: {filename}")
+            pending.append((file, out_path, metadata, f.read()[:MAX_INPUT_CHARS]))
+
+    print(f"📄 {len(pending)} files to summarize ({skipped} up to date)")
+    # Longest first: similar lengths share a batch (little padding) and memory peaks early
+    pending.sort(key=lambda item: len(item[3]), reverse=True)
+
+    done = 0
+    start = time.perf_counter()
+    for i in range(0, len(pending), batch_size):
+        batch = pending[i:i + batch_size]
+        summaries = summarize_batch([content for *_, content in batch], backend=backend)
+        for (file, out_path, metadata, _), summary in zip(batch, summaries):
+            _write_json(out_path, {"summary": summary, **metadata})
+        done += len(batch)
+        rate = done / (time.perf_counter() - start)
+        print(f"✅ Summarized batch of {len(batch)} ({done}/{len(pending)}, {rate:.2f} files/sec)")
+
+    result = {"summarized": done, "skipped": skipped}
+    if backend == "ollama" and done:
+        result["llm"] = llm = get_llm_client().metrics.snapshot()
+        print(f"📊 Ollama: {llm['calls']} calls, {llm['errors']} errors, p50 {llm['p50_latency_s'] or 0:.2f}s, "
+              f"{llm['tokens_per_s'] or 0:.1f} tokens/sec")
+    return result
 
 if __name__ == "__main__":
     INPUT_TXT_DIR = "./data/raw/ai-startup-Raw"          # Adjust per keyword
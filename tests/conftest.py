@@ -0,0 +1,101 @@
+# conftest.py
+# Shared fixtures. Modules are imported through the vector package, like the root scripts do.
+
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def _matches(meta, where):
+    """The subset of Chroma's where syntax the pipeline uses."""
+    for key, condition in (where or {}).items():
+        if key == "$and":
+            if not all(_matches(meta, w) for w in condition):
+                return False
+            continue
+        value = meta.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, expected in condition.items():
+            ok = {
+                "$eq": lambda: value == expected,
+                "$ne": lambda: value != expected,
+                "$in": lambda: value in expected,
+                "$nin": lambda: value not in expected,
+                "$gte": lambda: value is not None and value >= expected,
+                "$lte": lambda: value is not None and value <= expected,
+            }[op]()
+            if not ok:
+                return False
+    return True
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection; like Chroma, it rejects None metadata values."""
+
+    def __init__(self, name="fake"):
+        self.name = name
+        self.metadata = {}
+        self.records = {}  # id → (document, metadata, embedding)
+
+    def count(self):
+        return len(self.records)
+
+    def modify(self, metadata=None):
+        self.metadata = dict(metadata or {})
+
+    def add(self, ids, documents=None, metadatas=None, embeddings=None):
+        if len(set(ids)) != len(ids) or set(ids) & set(self.records):
+            raise ValueError("duplicate ids")
+        self.upsert(ids, documents, metadatas, embeddings)
+
+    def upsert(self, ids, documents=None, metadatas=None, embeddings=None):
+        for i, record_id in enumerate(ids):
+            meta = dict(metadatas[i]) if metadatas else {}
+            if any(v is None for v in meta.values()):
+                raise ValueError(f"None metadata value in {meta}")
+            self.records[record_id] = (documents[i] if documents else None, meta,
+                                       list(embeddings[i]) if embeddings is not None else None)
+
+    def update(self, ids, metadatas=None):
+        for record_id, meta in zip(ids, metadatas):
+            document, _, embedding = self.records[record_id]
+            self.records[record_id] = (document, dict(meta), embedding)
+
+    def delete(self, ids=None):
+        for record_id in ids or []:
+            self.records.pop(record_id, None)
+
+    def get(self, ids=None, where=None, include=("documents", "metadatas"), limit=None, offset=0):
+        selected = [i for i in (ids if ids is not None else self.records) if i in self.records]
+        selected = [i for i in selected if _matches(self.records[i][1], where)]
+        selected = selected[offset:offset + limit if limit else None]
+        return {
+            "ids": selected,
+            "documents": [self.records[i][0] for i in selected] if "documents" in include else None,
+            "metadatas": [self.records[i][1] for i in selected] if "metadatas" in include else None,
+            "embeddings": [self.records[i][2] for i in selected] if "embeddings" in include else None,
+        }
+
+
+@pytest.fixture
+def fake_collection():
+    return FakeCollection()
+
+
+def write_post(path, body, **meta):
+    """Write a post in the scraper's .txt format (--- METADATA --- header + body)."""
+    header = "\n".join(f"{k}: {v}" for k, v in meta.items())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"--- METADATA ---\n{header}\n----------------\n{body}")
+    return path
+
+
+@pytest.fixture
+def post_writer():
+    return write_post
@@ -0,0 +1,48 @@
+# test_bm25_index.py
+# BM25 keyword search, RRF fusion and the sidecar check used by hybrid retrieval.
+
+from vector.bm25_index import BM25Index, check_bm25_index, fuse_hits, rebuild_from_collection, reciprocal_rank_fusion
+
+
+def make_index(tmp_path):
+    index = BM25Index(str(tmp_path / "posts.bm25.sqlite"))
+    index.upsert(["a", "b", "c"], [
+        "Hiring a senior Rust engineer for our startup",
+        "Our startup raised a seed round",
+        "Weekend hiking photos",
+    ])
+    return index
+
+
+def test_search_ranks_keyword_matches(tmp_path):
+    index = make_index(tmp_path)
+    assert [doc_id for doc_id, _ in index.search("rust engineer")] == ["a"]
+    assert {doc_id for doc_id, _ in index.search("startup")} == {"a", "b"}
+    index.delete(["a"])
+    assert index.search("rust") == []
+    assert index.count() == 2
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "d"]])
+    assert [doc_id for doc_id, _ in fused] == ["b", "c", "a", "d"]
+
+
+def test_fuse_hits_fetches_keyword_only_hits(fake_collection):
+    fake_collection.add(ids=["a", "b"], documents=["dense", "keyword"], metadatas=[{"k": 1}, {"k": 2}])
+    hits = fuse_hits(fake_collection, [("a", "dense", {"k": 1})], [("b", 3.0)], n_results=2)
+    assert [h[0] for h in hits] == ["a", "b"]
+    assert hits[1] == ("b", "keyword", {"k": 2})
+
+
+def test_check_warns_when_index_lags_the_collection(tmp_path, fake_collection, capsys):
+    fake_collection.add(ids=["a", "b"], documents=["rust startup", "seed round"], metadatas=[{}, {}])
+    index = BM25Index(str(tmp_path / "empty.bm25.sqlite"))
+
+    assert check_bm25_index(index, fake_collection, "./chroma_db", "linkedin_posts") is index
+    assert "covers 0 of 2" in capsys.readouterr().out
+
+    rebuild_from_collection(fake_collection, index)
+    check_bm25_index(index, fake_collection, "./chroma_db", "linkedin_posts")
+    assert capsys.readouterr().out == ""
+    assert [doc_id for doc_id, _ in index.search("rust")] == ["a"]
@@ -0,0 +1,52 @@
+# test_chunking.py
+# Chunk ids/metadata, reassembly of overlapping chunks, and chunk selection for the LLM.
+
+from vector.chunking import (best_chunks, chunk_id, chunk_records, chunk_text, is_chunk_id,
+                             load_full_posts, parent_id_of, reassemble)
+
+LONG_POST = " ".join(f"Sentence number {i} talks about retrieval and latency." for i in range(60))
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("Just a short post.") == [(0, "Just a short post.", 0, 18)]
+
+
+def test_chunks_are_overlapping_slices_that_reassemble():
+    chunks = chunk_text(LONG_POST, max_tokens=50, overlap=10)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert LONG_POST[chunk.start:chunk.end] == chunk.text
+    assert all(b.start < a.end for a, b in zip(chunks, chunks[1:]))
+
+    ids, documents, metadatas = chunk_records("post-1", LONG_POST, {"category": "AI"})
+    assert ids == [chunk_id("post-1", i) for i in range(len(ids))]
+    assert {m["chunk_count"] for m in metadatas} == {len(ids)}
+    shuffled = list(zip(documents, metadatas))[::-1]
+    assert reassemble(shuffled) == LONG_POST
+
+
+def test_chunk_ids_point_back_to_their_post():
+    assert is_chunk_id("post-1#3") and not is_chunk_id("post-1")
+    assert parent_id_of("post-1#3") == "post-1"
+    assert parent_id_of("whatever", {"parent_id": "post-2"}) == "post-2"
+
+
+def test_load_full_posts_reassembles_chunked_and_whole_posts(fake_collection):
+    ids, documents, metadatas = chunk_records("post-1", LONG_POST, {"category": "AI"})
+    fake_collection.add(ids=ids, documents=documents, metadatas=metadatas)
+    fake_collection.add(ids=["legacy"], documents=["An older whole-post record."], metadatas=[{"category": "Misc"}])
+
+    loaded = load_full_posts(fake_collection, [ids[1], "legacy"])
+    assert loaded[ids[1]][0] == LONG_POST
+    assert loaded["legacy"] == ("An older whole-post record.", {"category": "Misc"})
+
+
+def test_best_chunks_groups_by_post_in_reading_order():
+    ids, documents, metadatas = chunk_records("post-1", LONG_POST, {})
+    hits = [(ids[1], documents[1], metadatas[1]), ("other", "Other post.", {}), (ids[0], documents[0], metadatas[0])]
+
+    posts = best_chunks(hits, top_posts=1, per_post=2)
+    assert len(posts) == 1
+    meta, context = posts[0]
+    assert meta["chunk_index"] == 0
+    assert context == LONG_POST[metadatas[0]["chunk_start"]:metadatas[1]["chunk_end"]]
@@ -0,0 +1,73 @@
+# test_ingest_manifest.py
+# Manifest diffing: what an ingest run re-reads and re-embeds.
+
+import os
+
+from vector.ingest_manifest import IngestManifest, manifest_path_for
+
+
+def record(manifest, path, doc_id):
+    state, _ = manifest.read_if_changed(path)
+    manifest.record(state, doc_id)
+    return state
+
+
+def test_manifest_sits_beside_the_chroma_dir():
+    assert manifest_path_for("./chroma_db/") == "chroma_db.manifest.sqlite"
+
+
+def test_unchanged_file_is_skipped_and_edit_is_reread(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "m.sqlite"))
+    path = tmp_path / "post.txt"
+    path.write_text("first version")
+
+    assert manifest.stat_changed(str(path))
+    state = record(manifest, str(path), "doc-1")
+    assert not manifest.stat_changed(str(path))
+    assert manifest.read_if_changed(str(path)) is None
+
+    path.write_text("second version, longer")
+    changed = manifest.read_if_changed(str(path))
+    assert changed is not None
+    new_state, raw = changed
+    assert raw == b"second version, longer"
+    assert new_state.content_hash != state.content_hash
+
+
+def test_touched_but_identical_file_only_refreshes_stat(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "m.sqlite"))
+    path = tmp_path / "post.txt"
+    path.write_text("same text")
+    record(manifest, str(path), "doc-1")
+
+    st = os.stat(path)
+    os.utime(path, (st.st_atime + 5, st.st_mtime + 5))
+    assert manifest.stat_changed(str(path))
+    assert manifest.read_if_changed(str(path)) is None
+    assert not manifest.stat_changed(str(path))
+    assert manifest.get(str(path)).doc_id == "doc-1"
+
+
+def test_forget_reports_orphaned_doc_ids(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "m.sqlite"))
+    for name, doc_id in [("a.txt", "shared"), ("b.txt", "shared"), ("c.txt", "solo")]:
+        (tmp_path / name).write_text(name)
+        record(manifest, str(tmp_path / name), doc_id)
+
+    assert manifest.paths_for("shared") == {str(tmp_path / "a.txt"), str(tmp_path / "b.txt")}
+    gone = manifest.forget([str(tmp_path / "a.txt"), str(tmp_path / "c.txt"), str(tmp_path / "missing.txt")])
+    assert gone == {"shared", "solo"}
+    assert manifest.orphans(gone) == {"solo"}
+    assert manifest.tracked_paths() == {str(tmp_path / "b.txt")}
+
+
+def test_record_skipped_returns_the_doc_id_it_replaces(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "m.sqlite"))
+    path = tmp_path / "post.txt"
+    path.write_text("a real post")
+    state = record(manifest, str(path), "doc-1")
+
+    assert manifest.record_skipped(state) == "doc-1"
+    assert manifest.get(str(path)).doc_id is None
+    assert manifest.record_skipped(state) is None
+    assert manifest.orphans({"doc-1"}) == {"doc-1"}
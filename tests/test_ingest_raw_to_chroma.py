@@ -0,0 +1,135 @@
+import os
+
+import pytest
+
+from vector import ingest_raw_to_chroma as irc
+from vector.bm25_index import BM25Index
+from vector.near_duplicates import NearDuplicateIndex, minhash
+
+BODY = ("Our team just shipped a retrieval-augmented assistant in under six months. "
+        "Here is what we learned about chunking, evaluation and latency budgets. #AI #startups")
+
+
+@pytest.fixture
+def ingest_env(tmp_path, monkeypatch, fake_collection):
+    """ingest() against a fake collection, with the manifest and sidecar indexes under tmp_path."""
+    chroma_path = str(tmp_path / "chroma_db")
+    bm25 = BM25Index(str(tmp_path / "bm25.sqlite"))
+    near_dups = NearDuplicateIndex(str(tmp_path / "neardup.sqlite"))
+    monkeypatch.setattr(irc, "CHROMA_PATH", chroma_path)
+    monkeypatch.setattr(irc, "MANIFEST_PATH", chroma_path + ".manifest.sqlite")
+    monkeypatch.setattr(irc, "DATA_ROOT", str(tmp_path / "raw"))
+    monkeypatch.setattr(irc, "CATALOG_DIR", None)
+    monkeypatch.setattr(irc, "get_collection", lambda: fake_collection)
+    monkeypatch.setattr(irc, "get_bm25", lambda: bm25)
+    monkeypatch.setattr(irc, "get_near_dups", lambda: near_dups)
+    yield tmp_path / "raw", fake_collection
+    near_dups.close()
+
+
+def posts(collection):
+    """{parent_id: [chunk metadata, ...]} of everything stored."""
+    stored = {}
+    for meta in collection.get(include=["metadatas"])["metadatas"]:
+        stored.setdefault(meta["parent_id"], []).append(meta)
+    return stored
+
+
+def touch_later(path):
+    st = os.stat(path)
+    os.utime(path, (st.st_atime + 5, st.st_mtime + 5))
+
+
+def test_edited_file_is_reembedded_with_new_metadata(ingest_env, post_writer):
+    raw, collection = ingest_env
+    path = str(raw / "ai-startup" / "urn_li_activity_1_a.txt")
+    post_writer(path, BODY, keyword="ai startup", url="https://x/1", category="AI Tools", engagementScore=10)
+    irc.ingest()
+
+    post_writer(path, BODY, keyword="ai startup", url="https://x/1", category="Funding", engagementScore=999)
+    touch_later(path)
+    irc.ingest()
+
+    stored = posts(collection)
+    assert len(stored) == 1
+    (chunks,) = stored.values()
+    assert {m["engagementScore"] for m in chunks} == {999.0}
+    assert {m["category"] for m in chunks} == {"Funding"}
+    assert all("duplicates" not in m for m in chunks)
+
+
+def test_one_character_fix_replaces_the_post(ingest_env, post_writer):
+    raw, collection = ingest_env
+    path = str(raw / "ai-startup" / "urn_li_activity_1_a.txt")
+    post_writer(path, BODY, keyword="ai startup", category="AI Tools")
+    irc.ingest()
+    before = set(posts(collection))
+
+    post_writer(path, BODY.replace("#startups", "#startupz"), keyword="ai startup", category="AI Tools")
+    touch_later(path)
+    irc.ingest()
+
+    after = posts(collection)
+    assert len(after) == 1 and set(after) != before
+    assert "#startupz" in collection.get(include=["documents"])["documents"][0]
+
+
+def test_near_duplicate_is_collapsed_into_the_canonical_post(ingest_env, post_writer):
+    raw, collection = ingest_env
+    post_writer(str(raw / "ai-startup" / "urn_li_activity_1_a.txt"), BODY,
+                keyword="ai startup", category="AI Tools")
+    post_writer(str(raw / "fintech" / "urn_li_activity_2_b.txt"), BODY + " #repost",
+                keyword="fintech", category="Funding")
+    irc.ingest()
+
+    stored = posts(collection)
+    assert len(stored) == 1
+    (chunks,) = stored.values()
+    assert {m["keywords"] for m in chunks} == {"ai startup, fintech"}
+    assert {m["categories"] for m in chunks} == {"AI Tools, Funding"}
+    assert {m["duplicates"] for m in chunks} == {1}
+
+
+def test_canonical_survives_while_a_duplicate_still_points_at_it(ingest_env, post_writer):
+    raw, collection = ingest_env
+    original = post_writer(str(raw / "ai-startup" / "urn_li_activity_1_a.txt"), BODY, keyword="ai startup")
+    post_writer(str(raw / "fintech" / "urn_li_activity_2_b.txt"), BODY + " #repost", keyword="fintech")
+    irc.ingest()
+
+    os.remove(original)
+    irc.ingest()
+    assert len(posts(collection)) == 1
+
+
+def test_file_edited_down_to_nothing_drops_its_post(ingest_env, post_writer):
+    raw, collection = ingest_env
+    path = post_writer(str(raw / "ai-startup" / "urn_li_activity_1_a.txt"), BODY, keyword="ai startup")
+    irc.ingest()
+
+    post_writer(path, "tiny", keyword="ai startup")
+    touch_later(path)
+    irc.ingest()
+    assert posts(collection) == {}
+    assert irc.get_bm25().count() == 0
+    assert irc.get_near_dups().find(minhash(BODY)) is None
+
+    os.remove(path)
+    irc.ingest()
+    assert posts(collection) == {}
+
+
+def test_catalog_rows_with_null_columns_get_defaults(ingest_env, post_writer, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from vector.post_catalog import build_catalog
+
+    raw, collection = ingest_env
+    post_writer(str(raw / "ai-startup" / "urn_li_activity_1_a.txt"), BODY, keyword="ai startup")  # no url/category
+    catalog_dir = str(tmp_path / "catalog")
+    assert build_catalog(str(raw), catalog_dir) == 1
+    monkeypatch.setattr(irc, "CATALOG_DIR", catalog_dir)
+
+    irc.ingest()
+
+    (chunks,) = posts(collection).values()
+    assert {m["url"] for m in chunks} == {"N/A"}
+    assert {m["category"] for m in chunks} == {"Uncategorized"}
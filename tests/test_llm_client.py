@@ -0,0 +1,81 @@
+import json
+
+import pytest
+import requests
+
+from vector.llm_client import LLMClient, LLMError
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, lines, fail_after=None, error=None):
+        self.lines = lines
+        self.fail_after = fail_after
+        self.error = error
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        for i, line in enumerate(self.lines):
+            if i == self.fail_after:
+                raise self.error
+            yield line
+
+    def json(self):
+        return json.loads(self.lines[0])
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def client_returning(response):
+    client = LLMClient(retries=0)
+    client.session.post = lambda *args, **kwargs: response
+    return client
+
+
+def tokens(*words, done=True):
+    lines = [json.dumps({"response": w}).encode() for w in words]
+    return lines + ([json.dumps({"done": True, "eval_count": len(words)}).encode()] if done else [])
+
+
+def test_stream_yields_tokens_and_records_metrics():
+    client = client_returning(FakeResponse(tokens("Hello", " world")))
+    assert "".join(client.stream("hi")) == "Hello world"
+    assert client.metrics.calls[-1]["completion_tokens"] == 2
+
+    summary = client.metrics.snapshot()
+    assert summary["calls"] == 1 and summary["errors"] == 0
+    assert summary["completion_tokens"] == 2
+
+
+def test_connection_drop_mid_stream_raises_llm_error():
+    response = FakeResponse(tokens("Hello", " world"), fail_after=1,
+                            error=requests.exceptions.ChunkedEncodingError("connection broken"))
+    client = client_returning(response)
+    received = []
+    with pytest.raises(LLMError):
+        for token in client.stream("hi"):
+            received.append(token)
+    assert received == ["Hello"]
+    assert client.metrics.calls[-1]["error"]
+
+
+def test_malformed_stream_line_raises_llm_error():
+    client = client_returning(FakeResponse([b"{not json"]))
+    with pytest.raises(LLMError):
+        list(client.stream("hi"))
+
+
+def test_malformed_json_body_raises_llm_error():
+    client = client_returning(FakeResponse([b"<html>"]))
+    with pytest.raises(LLMError):
+        client.generate("hi")
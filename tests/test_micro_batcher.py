@@ -0,0 +1,71 @@
+# test_micro_batcher.py
+# Concurrent submits share one process_batch call; errors reach every caller in the batch.
+
+import asyncio
+
+import pytest
+
+from vector.micro_batcher import LatencyStats, MicroBatcher
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_submits_are_batched_in_order():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+        await batcher.stop()
+        return results, batcher.stats.snapshot()
+
+    results, stats = run(main())
+    assert results == [0, 2, 4, 6, 8, 10]
+    assert calls == [[0, 1, 2, 3], [4, 5]]
+    assert stats["requests"] == 6
+    assert stats["avg_batch_size"] == 3.0
+
+
+def test_batch_error_is_raised_to_each_caller_and_worker_keeps_running():
+    def process(items):
+        if "bad" in items:
+            raise ValueError("boom")
+        return items
+
+    async def main():
+        batcher = MicroBatcher(process, max_wait_ms=20)
+        failed = await asyncio.gather(batcher.submit("bad"), batcher.submit("ok"), return_exceptions=True)
+        after = await batcher.submit("later")
+        await batcher.stop()
+        return failed, after
+
+    failed, after = run(main())
+    assert all(isinstance(e, ValueError) for e in failed)
+    assert after == "later"
+
+
+def test_empty_stats():
+    assert LatencyStats().snapshot() == {"requests": 0}
+
+
+@pytest.mark.parametrize("max_batch_size", [1, 3])
+def test_batch_size_is_capped(max_batch_size):
+    sizes = []
+
+    def process(items):
+        sizes.append(len(items))
+        return items
+
+    async def main():
+        batcher = MicroBatcher(process, max_batch_size=max_batch_size, max_wait_ms=50)
+        await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.stop()
+
+    run(main())
+    assert max(sizes) <= max_batch_size and sum(sizes) == 5
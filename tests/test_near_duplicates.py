@@ -0,0 +1,45 @@
+# test_near_duplicates.py
+# MinHash signatures, LSH lookup and the metadata merged onto the canonical post.
+
+from vector.near_duplicates import NearDuplicateIndex, merge_metadata, minhash, near_dup_path_for, similarity
+
+POST = ("Our team just shipped a retrieval-augmented assistant in under six months. "
+        "Here is what we learned about chunking, evaluation and latency budgets.")
+
+
+def test_signatures_estimate_jaccard_similarity():
+    assert minhash("") is None
+    assert similarity(minhash(POST), minhash(POST)) == 1.0
+    assert similarity(minhash(POST), minhash(POST + " #AI #startups")) >= 0.8
+    assert similarity(minhash(POST), minhash("Weekend hiking photos from the Alps, great views all around.")) < 0.2
+
+
+def test_find_returns_closest_match_and_honours_exclude(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "neardup.sqlite"), threshold=0.8)
+    index.add("canonical", minhash(POST))
+    index.add("unrelated", minhash("Weekend hiking photos from the Alps, great views all around."))
+    index.commit()
+
+    repost = minhash(POST + " #AI #startups")
+    doc_id, score = index.find(repost)
+    assert doc_id == "canonical" and score >= 0.8
+    assert index.find(repost, exclude={"canonical"}) is None
+
+    index.remove(["canonical"])
+    assert index.find(repost) is None
+    index.close()
+
+
+def test_merge_metadata_collects_keywords_and_counts_duplicates():
+    canonical = {"keyword": "ai startup", "category": "AI Tools"}
+    merged = merge_metadata(canonical, {"keyword": "rag", "category": "AI Tools"})
+    merged = merge_metadata(merged, {"keyword": "ai startup", "category": "Funding"})
+
+    assert merged["keywords"] == "ai startup, rag"
+    assert merged["categories"] == "AI Tools, Funding"
+    assert merged["duplicates"] == 2
+    assert canonical == {"keyword": "ai startup", "category": "AI Tools"}
+
+
+def test_index_sits_beside_the_chroma_dir():
+    assert near_dup_path_for("./chroma_db", "posts") == "chroma_db.posts.neardup.sqlite"
@@ -0,0 +1,42 @@
+# test_ocr_helper.py
+# Text-block cropping: framed slides keep their text, blank slides skip tesseract.
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("pytesseract")
+pytest.importorskip("PIL")
+np = pytest.importorskip("numpy")
+
+from ocr_helper import binarize, crop_to_text
+
+
+def slide(frame=False, text=True):
+    image = np.full((600, 800), 255, dtype=np.uint8)
+    if frame:
+        cv2.rectangle(image, (4, 4), (795, 595), 0, 6)
+    if text:
+        cv2.putText(image, "Lessons learned", (150, 300), cv2.FONT_HERSHEY_SIMPLEX, 2, 0, 4)
+    return binarize(image)
+
+
+def test_text_is_cropped_to_its_block():
+    cropped = crop_to_text(slide())
+    assert cropped is not None
+    assert cropped.shape[0] < 300 and cropped.shape[1] < 800
+
+
+def test_framed_slide_keeps_the_text_inside_the_frame():
+    cropped = crop_to_text(slide(frame=True))
+    assert cropped is not None
+    assert (cropped < 128).any()
+    assert cropped.shape[0] < 300
+
+
+def test_frame_without_detectable_blocks_falls_back_to_whole_image():
+    binary = slide(frame=True, text=False)
+    assert crop_to_text(binary).shape == binary.shape
+
+
+def test_blank_slide_is_skipped():
+    assert crop_to_text(slide(text=False)) is None
@@ -0,0 +1,74 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from vector.embedding_backends import EmbeddingMismatchError, HashingEmbedder
+from vector.quantized_index import QuantizedIndex, export_collection
+
+DOCS = [
+    ("a", "Series A funding round for an AI startup", {"category": "Funding", "engagementScore": 120, "keyword": "ai startup"}),
+    ("b", "Hiring senior engineers for our LLM agents team", {"category": "Hiring", "engagementScore": 40, "keyword": "hiring"}),
+    ("c", "We open-sourced our vector search on Postgres", {"category": "AI Tools", "engagementScore": 300, "keyword": "ai startup"}),
+    ("d", "Climate tech seed round closes at 4M", {"category": "Funding", "engagementScore": 15, "keyword": "climate tech"}),
+]
+
+
+@pytest.fixture
+def backend():
+    return HashingEmbedder(dim=64)
+
+
+@pytest.fixture
+def index_dir(tmp_path, fake_collection, backend):
+    ids, docs, metas = zip(*DOCS)
+    fake_collection.add(ids=list(ids), documents=list(docs), metadatas=list(metas),
+                        embeddings=backend.encode(list(docs)).tolist())
+    fake_collection.modify(metadata=backend.spec())
+    out = str(tmp_path / "index")
+    assert export_collection(fake_collection, out, page_size=3) == len(DOCS)
+    return out
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16"])
+def test_round_trip_keeps_ranking_and_columns(tmp_path, fake_collection, backend, dtype):
+    ids, docs, metas = zip(*DOCS)
+    embeddings = backend.encode(list(docs))
+    fake_collection.add(ids=list(ids), documents=list(docs), metadatas=list(metas), embeddings=embeddings.tolist())
+    out = str(tmp_path / dtype)
+    export_collection(fake_collection, out, dtype=dtype)
+
+    index = QuantizedIndex(out)
+    query = backend.encode(["AI startup funding round"])
+    exact = [DOCS[i][0] for i in np.argsort(-(embeddings @ query[0]))]
+    result = index.query(query, n_results=4)
+    assert result["ids"][0] == exact
+    assert result["documents"][0][0] == dict((d[0], d[1]) for d in DOCS)[exact[0]]
+    assert all(0 <= d <= 2 for d in result["distances"][0])
+    assert os.path.exists(os.path.join(out, "columns.arrow"))
+
+
+def test_where_filters_and_get_by_id(index_dir, backend):
+    index = QuantizedIndex(index_dir, backend=backend)
+    result = index.query(backend.encode(["funding"]), n_results=10, where={"category": "Funding"})
+    assert sorted(result["ids"][0]) == ["a", "d"]
+
+    ranged = index.query(backend.encode(["funding"]), n_results=10,
+                         where={"$and": [{"engagementScore": {"$gte": 40}}, {"keyword": {"$in": ["ai startup", "hiring"]}}]})
+    assert sorted(ranged["ids"][0]) == ["a", "b", "c"]
+
+    got = index.get(ids=["c", "missing", "a"])
+    assert got["ids"] == ["c", "a"]
+    assert got["metadatas"][0] == DOCS[2][2]
+    assert index.get(ids=["a", "b"], where={"category": "Hiring"})["ids"] == ["b"]
+    assert index.query(backend.encode(["x"]), where={"no_such_field": 1})["ids"] == [[]]
+
+
+def test_backend_is_recorded_and_checked(index_dir, backend):
+    with open(os.path.join(index_dir, "info.json")) as f:
+        assert json.load(f)["embedding_backend"] == backend.name
+    with pytest.raises(EmbeddingMismatchError):
+        QuantizedIndex(index_dir, backend=HashingEmbedder(dim=128))
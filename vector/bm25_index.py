@@ -0,0 +1,184 @@
+# bm25_index.py
+# Local BM25 inverted index (SQLite) over the same documents stored in Chroma,
+# kept in sync by the ingest scripts, plus reciprocal rank fusion (RRF) to
+# combine keyword and vector rankings ("hybrid" retrieval mode).
+#
+# Rebuild from an existing collection:
+#   python vector/bm25_index.py <chroma_path> <collection_name> [--legacy]
+
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import Counter
+
+try:
+    from .registry import get_or_create
+except ImportError:  # imported as a top-level module from inside vector/
+    from registry import get_or_create
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60
+RETRIEVAL_MODES = ("vector", "bm25", "hybrid")
+
+# Words, numbers, tool names like gpt-4 / c++ / node.js; '#' and '@' are stripped
+TOKEN_RE = re.compile(r"\w+(?:[.+\-]\w+)*\+*")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def bm25_path_for(chroma_path, collection_name):
+    """Index lives beside the Chroma directory, one file per collection."""
+    return f"{os.path.normpath(chroma_path)}.{collection_name}.bm25.sqlite"
+
+
+class BM25Index:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS docs (doc_id TEXT PRIMARY KEY, length INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings(doc_id);
+        """)
+        self.conn.commit()
+
+    def _delete(self, doc_ids):
+        self.conn.executemany("DELETE FROM postings WHERE doc_id = ?", [(d,) for d in doc_ids])
+        self.conn.executemany("DELETE FROM docs WHERE doc_id = ?", [(d,) for d in doc_ids])
+
+    def upsert(self, doc_ids, texts):
+        with self._lock:
+            self._delete(doc_ids)
+            for doc_id, text in zip(doc_ids, texts):
+                counts = Counter(tokenize(text))
+                self.conn.execute("INSERT INTO docs (doc_id, length) VALUES (?, ?)",
+                                  (doc_id, sum(counts.values())))
+                self.conn.executemany("INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                                      [(term, doc_id, tf) for term, tf in counts.items()])
+            self.conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self.conn.executescript("DELETE FROM postings; DELETE FROM docs;")
+            self.conn.commit()
+
+    def delete(self, doc_ids):
+        with self._lock:
+            self._delete(list(doc_ids))
+            self.conn.commit()
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def search(self, query, k=10):
+        """[(doc_id, bm25_score), ...] best first."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            n_docs, avg_len = self.conn.execute("SELECT COUNT(*), AVG(length) FROM docs").fetchone()
+            if not n_docs:
+                return []
+            scores = Counter()
+            for term in terms:
+                rows = self.conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p JOIN docs d ON d.doc_id = p.doc_id WHERE p.term = ?",
+                    (term,),
+                ).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+                for doc_id, tf, length in rows:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+                    scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores.most_common(k)
+
+    def close(self):
+        self.conn.close()
+
+
+def get_bm25_index(chroma_path, collection_name):
+    """Shared per-process index for the given Chroma collection."""
+    return get_or_create(
+        ("bm25", chroma_path, collection_name),
+        lambda: BM25Index(bm25_path_for(chroma_path, collection_name)),
+    )
+
+
+def check_bm25_index(index, collection, chroma_path, collection_name):
+    """
+    Warn when the index holds fewer documents than the collection: hybrid retrieval
+    would otherwise quietly fall back to dense-only results for the missing ones.
+    """
+    indexed, stored = index.count(), collection.count()
+    if indexed < stored:
+        print(f"⚠️ BM25 index {index.db_path} covers {indexed} of {stored} documents; hybrid retrieval "
+              f"is dense-only for the rest. Rebuild: python vector/bm25_index.py {chroma_path} {collection_name}")
+    return index
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """Fuse several best-first id lists → [(id, rrf_score), ...] best first."""
+    fused = Counter()
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] += 1.0 / (k + rank + 1)
+    return fused.most_common()
+
+
+def fuse_hits(collection, vector_hits, bm25_hits, n_results, where=None):
+    """
+    RRF-merge vector hits [(id, doc, meta)] with BM25 hits [(id, score)].
+    Keyword-only hits are fetched from Chroma (honouring `where`) → [(id, doc, meta)].
+    """
+    fused = reciprocal_rank_fusion([[h[0] for h in vector_hits], [doc_id for doc_id, _ in bm25_hits]])
+    known = {h[0]: h for h in vector_hits}
+    missing = [doc_id for doc_id, _ in fused[:n_results * 2] if doc_id not in known]
+    if missing:
+        kwargs = {"ids": missing, "include": ["documents", "metadatas"]}
+        if where:
+            kwargs["where"] = where
+        page = collection.get(**kwargs)
+        known.update((i, (i, d, m)) for i, d, m in zip(page["ids"], page["documents"], page["metadatas"]))
+    return [known[doc_id] for doc_id, _ in fused if doc_id in known][:n_results]
+
+
+def rebuild_from_collection(collection, index, page_size=1000):
+    try:
+        from .chroma_scan import iter_pages
+    except ImportError:
+        from chroma_scan import iter_pages
+    index.clear()
+    total = 0
+    for page in iter_pages(collection, include=["documents"], page_size=page_size):
+        index.upsert(page["ids"], page["documents"])
+        total += len(page["ids"])
+    return total
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python bm25_index.py <chroma_path> <collection_name> [--legacy]")
+        sys.exit(1)
+
+    from registry import get_chroma_collection
+
+    chroma_path, collection_name = sys.argv[1], sys.argv[2]
+    collection = get_chroma_collection(chroma_path, collection_name, legacy="--legacy" in sys.argv)
+    index = get_bm25_index(chroma_path, collection_name)
+    count = rebuild_from_collection(collection, index)
+    print(f"✅ Indexed {count} documents → {index.db_path}")
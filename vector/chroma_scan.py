@@ -0,0 +1,32 @@
+# chroma_scan.py
+# Paginated, streaming scans over a Chroma collection, so callers never load the
+# whole corpus with one collection.get(). Filters (`where`) are pushed down to Chroma.
+
+import os
+
+SCAN_PAGE_SIZE = int(os.getenv("CHROMA_SCAN_PAGE_SIZE", 1000))
+
+
+def iter_pages(collection, where=None, include=("documents", "metadatas"), page_size=SCAN_PAGE_SIZE):
+    """Yield collection.get() result pages of at most `page_size` records (limit/offset)."""
+    offset = 0
+    while True:
+        kwargs = {"include": list(include), "limit": page_size, "offset": offset}
+        if where:
+            kwargs["where"] = where
+        page = collection.get(**kwargs)
+        if not page["ids"]:
+            return
+        yield page
+        if len(page["ids"]) < page_size:
+            return
+        offset += len(page["ids"])
+
+
+def iter_collection(collection, where=None, include=("documents", "metadatas"), page_size=SCAN_PAGE_SIZE):
+    """Yield (id, document, metadata) one record at a time; fields not in `include` are None."""
+    for page in iter_pages(collection, where=where, include=include, page_size=page_size):
+        ids = page["ids"]
+        documents = page.get("documents") or [None] * len(ids)
+        metadatas = page.get("metadatas") or [None] * len(ids)
+        yield from zip(ids, documents, metadatas)
@@ -1,40 +1,42 @@
 import hashlib
 import os
-import re
 import chromadb
-from embed_mistral import get_embedding
+from embedding_backends import get_backend, check_collection_backend
+from chunking import chunk_records
+from post_parser import parse_file, to_chroma_metadata
+from bm25_index import get_bm25_index
 
-client = chromadb.PersistentClient(path="chroma_store")
-collection = client.get_or_create_collection("linkedin_posts")
+CHROMA_PATH = "chroma_store"
+COLLECTION_NAME = "linkedin_posts"
 
-def parse_metadata_and_text(txt_path):
-    with open(txt_path, 'r') as f:
-        content = f.read()
+client = chromadb.PersistentClient(path=CHROMA_PATH)
+collection = client.get_or_create_collection(COLLECTION_NAME)
+backend = get_backend()
+check_collection_backend(collection, backend)
+bm25 = get_bm25_index(CHROMA_PATH, COLLECTION_NAME)  # keyword index kept in sync with the collection
 
-    metadata_block = re.search(r"--- METADATA ---\n(.*?)\n----------------", content, re.DOTALL)
-    if not metadata_block:
+def parse_metadata_and_text(txt_path):
+    record = parse_file(txt_path)
+    if record.metadata is None:
         return None
-
-    metadata_lines = metadata_block.group(1).splitlines()
-    metadata = {line.split(":")[0].strip(): line.split(":", 1)[1].strip() for line in metadata_lines if ":" in line}
-    main_text = content.split('--- METADATA ---')[1].split('----------------')[1].strip()
-    
-    return metadata, main_text
+    return to_chroma_metadata(record.metadata), record.body
 
 def compute_id(content):
     return hashlib.md5(content.encode("utf-8")).hexdigest()
 
 def embed_and_upload(txt_path):
-    metadata, main_text = parse_metadata_and_text(txt_path)
-    if not metadata: return False
+    parsed = parse_metadata_and_text(txt_path)
+    if not parsed: return False
+    metadata, main_text = parsed
 
     uid = compute_id(main_text)
-    embedding = get_embedding(main_text)
+    ids, documents, metadatas = chunk_records(uid, main_text, metadata)
 
     collection.upsert(
-        ids=[uid],
-        documents=[main_text],
-        metadatas=[metadata],
-        embeddings=[embedding]
+        ids=ids,
+        documents=documents,
+        metadatas=metadatas,
+        embeddings=backend.encode(documents).tolist()
     )
+    bm25.upsert(ids, documents)
     return True
\ No newline at end of file
@@ -0,0 +1,171 @@
+# chunking.py
+# Token-aware chunking of long posts (body + OCR'd carousel slides) before embedding.
+#
+# Each chunk is stored as its own record with id "<parent_id>#<index>" and metadata
+# linking it back to the post (parent_id, chunk_index, chunk_count, chunk_start,
+# chunk_end). Chunks are exact slices of the body, so the post can be reassembled.
+# Records without parent_id are older whole-post vectors and are treated as one chunk.
+
+import os
+import re
+from collections import namedtuple
+
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", 200))       # ≈ model tokens per chunk
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 40))      # tokens repeated between neighbours
+CHUNKS_PER_POST = int(os.getenv("CHUNKS_PER_POST", 2))   # best chunks of one post sent to the LLM
+CHUNK_SEP = "#"
+
+# Words and single punctuation marks: close to subword-tokenizer counts without loading one
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+SENTENCE_END = {".", "!", "?"}
+
+Chunk = namedtuple("Chunk", ["index", "text", "start", "end"])
+
+
+def chunk_text(text, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP):
+    """
+    Split text into windows of at most max_tokens tokens, each overlapping the previous
+    one by `overlap` tokens. A window ends early on a sentence or line break found in
+    its last quarter so chunks don't stop mid-sentence.
+    """
+    spans = [m.span() for m in TOKEN_RE.finditer(text)]
+    if len(spans) <= max_tokens:
+        return [Chunk(0, text, 0, len(text))]
+
+    chunks = []
+    i = 0
+    while i < len(spans):
+        j = min(i + max_tokens, len(spans))
+        if j < len(spans):
+            for k in range(j, i + max_tokens * 3 // 4, -1):
+                last = text[spans[k - 1][0]:spans[k - 1][1]]
+                if last in SENTENCE_END or "\n" in text[spans[k - 1][1]:spans[k][0]]:
+                    j = k
+                    break
+        start, end = spans[i][0], spans[j - 1][1]
+        chunks.append(Chunk(len(chunks), text[start:end], start, end))
+        if j >= len(spans):
+            break
+        i = max(j - overlap, i + 1)
+    return chunks
+
+
+def chunk_id(parent_id, index):
+    return f"{parent_id}{CHUNK_SEP}{index}"
+
+
+def parent_id_of(record_id, meta=None):
+    if meta and meta.get("parent_id"):
+        return meta["parent_id"]
+    return record_id.split(CHUNK_SEP, 1)[0]
+
+
+def is_chunk_id(record_id):
+    return CHUNK_SEP in record_id
+
+
+def chunk_metadata(parent_id, chunk, chunk_count, meta):
+    return {
+        **meta,
+        "parent_id": parent_id,
+        "chunk_index": chunk.index,
+        "chunk_count": chunk_count,
+        "chunk_start": chunk.start,
+        "chunk_end": chunk.end,
+    }
+
+
+def chunk_records(parent_id, text, meta):
+    """→ (ids, documents, metadatas) for one post, ready for collection.add/upsert."""
+    chunks = chunk_text(text)
+    return (
+        [chunk_id(parent_id, c.index) for c in chunks],
+        [c.text for c in chunks],
+        [chunk_metadata(parent_id, c, len(chunks), meta) for c in chunks],
+    )
+
+
+def reassemble(chunks):
+    """Rebuild a post from [(document, metadata)] of its chunks, undoing the overlap."""
+    text, end = "", 0
+    for doc, meta in sorted(chunks, key=lambda c: c[1].get("chunk_index", 0)):
+        start = meta.get("chunk_start", end)
+        if not text:
+            text = doc
+        elif start < end:
+            text += doc[end - start:]
+        else:
+            text += " " + doc
+        end = meta.get("chunk_end", end + len(doc))
+    return text
+
+
+def chunk_ids_for(collection, parent_ids, batch_size=500):
+    """Ids of every stored chunk belonging to the given posts."""
+    parent_ids = list(parent_ids)
+    ids = []
+    for i in range(0, len(parent_ids), batch_size):
+        page = collection.get(where={"parent_id": {"$in": parent_ids[i:i + batch_size]}}, include=[])
+        ids.extend(page["ids"])
+    return ids
+
+
+def load_full_posts(collection, record_ids, batch_size=500):
+    """
+    Fetch whole posts for the given record ids (a chunk id or an older whole-post id)
+    → {record_id: (full_text, metadata)}.
+    """
+    record_ids = list(record_ids)
+    heads = {}
+    for i in range(0, len(record_ids), batch_size):
+        page = collection.get(ids=record_ids[i:i + batch_size], include=["documents", "metadatas"])
+        for rid, doc, meta in zip(page["ids"], page["documents"], page["metadatas"]):
+            heads[rid] = (doc, meta or {})
+
+    parents = list({parent_id_of(rid, meta) for rid, (_, meta) in heads.items() if meta.get("chunk_count", 1) > 1})
+    siblings = {}
+    for i in range(0, len(parents), batch_size):
+        page = collection.get(where={"parent_id": {"$in": parents[i:i + batch_size]}},
+                              include=["documents", "metadatas"])
+        for doc, meta in zip(page["documents"], page["metadatas"]):
+            siblings.setdefault(meta["parent_id"], []).append((doc, meta))
+
+    loaded = {}
+    for rid, (doc, meta) in heads.items():
+        parts = siblings.get(parent_id_of(rid, meta))
+        loaded[rid] = (reassemble(parts) if parts else doc, meta)
+    return loaded
+
+
+def best_chunks(hits, top_posts, per_post=CHUNKS_PER_POST):
+    """
+    Group ranked chunk hits [(id, document, metadata)] (best first) by post and keep the
+    top `per_post` chunks of the best `top_posts` posts → [(metadata, context)], where
+    context is those chunks in reading order. Whole-post records are cut to one chunk.
+    """
+    groups = {}
+    for rid, doc, meta in hits:
+        parent = parent_id_of(rid, meta)
+        if parent not in groups and len(groups) >= top_posts:
+            continue
+        group = groups.setdefault(parent, [])
+        if len(group) < per_post:
+            group.append((doc, meta))
+
+    posts = []
+    for group in groups.values():
+        group.sort(key=lambda c: c[1].get("chunk_index", 0))
+        if "parent_id" not in group[0][1]:
+            context = chunk_text(group[0][0])[0].text
+        else:
+            # Overlapping neighbours are merged back into one passage
+            parts, run_end = [], 0
+            for doc, meta in group:
+                if parts and meta["chunk_start"] < run_end:
+                    parts[-1] += doc[run_end - meta["chunk_start"]:]
+                else:
+                    parts.append(doc)
+                run_end = meta["chunk_end"]
+            context = "\n[…]\n".join(parts)
+        posts.append((group[0][1], context))
+    return posts
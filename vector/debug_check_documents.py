@@ -1,14 +1,21 @@
 # debug_check_documents.py
 from chromadb import PersistentClient
 from config import CHROMA_PATH
+from chroma_scan import iter_collection
 
 client = PersistentClient(path=CHROMA_PATH)
 collection = client.get_or_create_collection(name="linkedin-posts")
-results = collection.get(include=["documents", "metadatas"])
 
-empty_docs = [i for i, doc in enumerate(results["documents"]) if not doc.strip()]
-print(f"❌ Empty documents: {len(empty_docs)}")
+# Stream the documents page by page: count empties, keep the first 3 non-empty samples
+empty_docs = 0
+non_empty_samples = []
+for i, (_, doc, _) in enumerate(iter_collection(collection, include=["documents"])):
+    if not doc.strip():
+        empty_docs += 1
+    elif len(non_empty_samples) < 3:
+        non_empty_samples.append((i, doc[:300]))
+
+print(f"❌ Empty documents: {empty_docs}")
 
-non_empty_samples = [(i, doc[:300]) for i, doc in enumerate(results["documents"]) if doc.strip()][:3]
 for i, sample in non_empty_samples:
-    print(f"\n📄 Sample {i}:\n{sample}\n{'-'*40}")
\ No newline at end of file
+    print(f"\n📄 Sample {i}:\n{sample}\n{'-'*40}")
@@ -1,31 +1,23 @@
 # embed_mistral.py
-import requests
-import hashlib
-import numpy as np
+# Embeddings live in embedding_backends.py (get_backend("hashing") replaces the old get_embedding).
 
-MISTRAL_URL = "http://localhost:11434/v1/chat/completions"
-MISTRAL_MODEL = "mistral:instruct"
+try:
+    from .llm_client import get_llm_client, LLMError
+except ImportError:  # imported as a top-level module from inside vector/
+    from llm_client import get_llm_client, LLMError
 
-# ✅ Embedding using fixed-seed hash (or replace with real embedding logic)
-def get_embedding(text):
-    np.random.seed(int(hashlib.sha256(text.encode()).hexdigest(), 16) % (2**32))
-    return np.random.rand(384).tolist()
+MISTRAL_MODEL = "mistral:instruct"
 
-# ✅ Summarization using local Mistral/Ollama endpoint
-def run_mistral_summary(prompt):
+# ✅ Summarization using local Mistral/Ollama endpoint (shared pooled client)
+# Identical prompts (unchanged top posts) are answered from the LLM response cache.
+def run_mistral_summary(prompt, use_cache=True):
     try:
-        response = requests.post(
-            MISTRAL_URL,
-            json={
-                "model": MISTRAL_MODEL,
-                "messages": [{"role": "user", "content": prompt}],
-                "stream": False
-            },
-            timeout=60
+        content = get_llm_client().chat(
+            [{"role": "user", "content": prompt}],
+            model=MISTRAL_MODEL,
+            use_cache=use_cache
         )
-        response.raise_for_status()
-        data = response.json()
-        return data["choices"][0]["message"]["content"].strip()
-    except Exception as e:
+        return content.strip()
+    except LLMError as e:
         print(f"❌ Mistral summarization failed: {e}")
-        return ""
\ No newline at end of file
+        return ""
@@ -0,0 +1,153 @@
+# embedding_backends.py
+# Pluggable text → vector backends behind one interface: encode(texts) → float32 (n, dim).
+#
+#   hashing[:<dim>]                  fast, deterministic feature hashing of word uni/bigrams and
+#                                    character trigrams (no model, no global RNG, thread-safe)
+#   sentence-transformers:<model>    the real models used elsewhere (via the shared, cached registry)
+#
+# The backend that filled a collection is recorded in its metadata (embedding_backend,
+# embedding_dim) and checked whenever the collection is opened with a backend, so a
+# query model that doesn't match the stored vectors fails at open time instead of
+# returning nonsense (or a dimension error mid-query).
+
+import functools
+import os
+import zlib
+
+import numpy as np
+
+try:
+    from .bm25_index import tokenize
+    from .registry import get_or_create, get_embedder
+except ImportError:  # imported as a top-level module from inside vector/
+    from bm25_index import tokenize
+    from registry import get_or_create, get_embedder
+
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "hashing")
+HASHING_DIM = 384
+CHAR_NGRAM = 3
+CHAR_NGRAM_WEIGHT = 0.5   # character trigrams add typo/morphology robustness, words carry most signal
+
+
+class EmbeddingMismatchError(ValueError):
+    pass
+
+
+class EmbeddingBackend:
+    name = None
+    dim = None
+
+    def encode(self, texts, batch_size=64):
+        raise NotImplementedError
+
+    def spec(self):
+        """Collection metadata identifying this backend."""
+        return {"embedding_backend": self.name, "embedding_dim": self.dim}
+
+
+class HashingEmbedder(EmbeddingBackend):
+    """
+    Signed feature hashing ("hashing trick"): every feature is crc32-hashed to a column
+    and a ±1 sign (per-word results are memoised). A whole batch is accumulated with one
+    np.bincount over flat (row * dim + column) indices, then rows are L2-normalised.
+    """
+
+    def __init__(self, dim=HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing-v1:w12c{CHAR_NGRAM}"
+
+    def _hash(self, feature, weight):
+        h = zlib.crc32(feature.encode("utf-8"))
+        return (h >> 1) % self.dim, (weight if h & 1 else -weight)
+
+    @functools.lru_cache(maxsize=200000)
+    def _word_features(self, word):
+        """(column, signed weight) pairs of a word and its character trigrams; words repeat a lot."""
+        padded = f"<{word}>"
+        grams = [self._hash("#" + padded[i:i + CHAR_NGRAM], CHAR_NGRAM_WEIGHT)
+                 for i in range(len(padded) - CHAR_NGRAM + 1)]
+        return [self._hash(word, 1.0)] + grams
+
+    def features(self, text):
+        words = tokenize(text)
+        for w in words:
+            yield from self._word_features(w)
+        for a, b in zip(words, words[1:]):
+            yield self._hash(f"{a} {b}", 1.0)
+
+    def encode(self, texts, batch_size=1024):
+        if isinstance(texts, str):
+            texts = [texts]
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            flat, weights = [], []
+            for row, text in enumerate(texts[start:start + batch_size]):
+                for column, weight in self.features(text):
+                    flat.append(row * self.dim + column)
+                    weights.append(weight)
+            n = min(batch_size, len(texts) - start)
+            block = np.bincount(np.asarray(flat, dtype=np.int64), weights=np.asarray(weights),
+                                minlength=n * self.dim).reshape(n, self.dim)
+            out[start:start + n] = block / np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12)
+        return out
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.name = f"sentence-transformers:{model_name}"
+
+    @property
+    def model(self):
+        return get_embedder(self.model_name)
+
+    @property
+    def dim(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts, batch_size=64):
+        return np.asarray(self.model.encode(texts, batch_size=batch_size, show_progress_bar=False),
+                          dtype=np.float32)
+
+
+def get_backend(spec=EMBED_BACKEND):
+    """"hashing", "hashing:<dim>" or "sentence-transformers:<model>" → shared backend instance."""
+    kind, _, arg = spec.partition(":")
+
+    def load():
+        if kind == "hashing":
+            return HashingEmbedder(int(arg) if arg else HASHING_DIM)
+        if kind == "sentence-transformers":
+            return SentenceTransformerBackend(arg)
+        raise ValueError(f"Unknown embedding backend: {spec!r}")
+
+    return get_or_create(("embedding-backend", spec), load)
+
+
+def check_collection_backend(collection, backend):
+    """
+    Compare the collection's recorded backend/dimension with `backend`. Unlabelled
+    collections are labelled: directly when empty, after checking one stored vector's
+    dimension otherwise. Raises EmbeddingMismatchError on a mismatch.
+    """
+    meta = dict(collection.metadata or {})
+    recorded = meta.get("embedding_backend")
+    if recorded is None:
+        if collection.count():
+            sample = collection.get(limit=1, include=["embeddings"])["embeddings"]
+            if sample is not None and len(sample) and len(sample[0]) != backend.dim:
+                raise EmbeddingMismatchError(
+                    f"Collection '{collection.name}' stores {len(sample[0])}-d vectors; "
+                    f"{backend.name} produces {backend.dim}-d"
+                )
+        # hnsw:* settings can't be changed after creation, so they are not re-sent
+        user_meta = {k: v for k, v in meta.items() if not k.startswith("hnsw:")}
+        collection.modify(metadata={**user_meta, **backend.spec()})
+        return collection
+
+    if recorded != backend.name or int(meta.get("embedding_dim", backend.dim)) != backend.dim:
+        raise EmbeddingMismatchError(
+            f"Collection '{collection.name}' was built with {recorded} ({meta.get('embedding_dim')}-d); "
+            f"opened with {backend.name} ({backend.dim}-d)"
+        )
+    return collection
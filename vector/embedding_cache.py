@@ -0,0 +1,207 @@
+# embedding_cache.py
+# Shared embedding cache keyed by (model name, sha256(text)).
+#
+# Disk layout (EMBED_CACHE_DIR, default ./.embedding_cache):
+#   index.sqlite          (model, text_hash) → row, plus each model's dimension
+#   <model>.f32           append-only float32 rows, one per cached text
+#
+# An in-memory LRU sits in front of the disk store, and CachedEncoder wraps a
+# SentenceTransformer so only cache misses reach the transformer forward pass.
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", ".embedding_cache")
+EMBED_CACHE_LRU_SIZE = int(os.getenv("EMBED_CACHE_LRU_SIZE", 50000))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, cache_dir=EMBED_CACHE_DIR, lru_size=EMBED_CACHE_LRU_SIZE):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._dims = {}
+        # isolation_level=None → we manage transactions ourselves (BEGIN IMMEDIATE
+        # serialises writers across processes sharing the same cache directory)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"),
+                                    isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS models (model TEXT PRIMARY KEY, dim INTEGER NOT NULL)
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS vectors (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                row INTEGER NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+
+    def _vector_file(self, model):
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", model)
+        return os.path.join(self.cache_dir, f"{safe}.f32")
+
+    def _dim(self, model):
+        if model not in self._dims:
+            row = self.conn.execute("SELECT dim FROM models WHERE model = ?", (model,)).fetchone()
+            if row:
+                self._dims[model] = row[0]
+        return self._dims.get(model)
+
+    def _lru_put(self, key, vec):
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, model, hashes):
+        """Return {hash: vector} for the hashes found in memory or on disk."""
+        found = {}
+        with self._lock:
+            missing = []
+            for h in hashes:
+                vec = self._lru.get((model, h))
+                if vec is not None:
+                    self._lru.move_to_end((model, h))
+                    found[h] = vec
+                else:
+                    missing.append(h)
+
+            dim = self._dim(model)
+            if not missing or dim is None:
+                return found
+
+            rows = {}
+            for i in range(0, len(missing), 500):
+                part = missing[i:i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows.update(self.conn.execute(
+                    f"SELECT text_hash, row FROM vectors WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *part],
+                ).fetchall())
+            if not rows:
+                return found
+
+            row_bytes = dim * 4
+            with open(self._vector_file(model), "rb") as f:
+                for h, row in rows.items():
+                    f.seek(row * row_bytes)
+                    vec = np.frombuffer(f.read(row_bytes), dtype=np.float32)
+                    found[h] = vec
+                    self._lru_put((model, h), vec)
+        return found
+
+    def put_many(self, model, hashes, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(hashes):
+            return
+        dim = vectors.shape[1]
+
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                known = self._dim(model)
+                if known is None:
+                    self.conn.execute("INSERT OR IGNORE INTO models (model, dim) VALUES (?, ?)", (model, dim))
+                    self._dims[model] = dim
+                elif known != dim:
+                    raise ValueError(f"Embedding dim {dim} does not match cached dim {known} for {model}")
+
+                path = self._vector_file(model)
+                next_row = os.path.getsize(path) // (dim * 4) if os.path.exists(path) else 0
+                seen, new_hashes, new_vectors = set(), [], []
+                for h, vec in zip(hashes, vectors):
+                    if h in seen or self.conn.execute(
+                        "SELECT 1 FROM vectors WHERE model = ? AND text_hash = ?", (model, h)
+                    ).fetchone():
+                        continue
+                    seen.add(h)
+                    new_hashes.append(h)
+                    new_vectors.append(vec)
+
+                if new_vectors:
+                    with open(path, "ab") as f:
+                        f.write(np.ascontiguousarray(new_vectors, dtype=np.float32).tobytes())
+                    self.conn.executemany(
+                        "INSERT INTO vectors (model, text_hash, row) VALUES (?, ?, ?)",
+                        [(model, h, next_row + i) for i, h in enumerate(new_hashes)],
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+            for h, vec in zip(hashes, vectors):
+                self._lru_put((model, h), vec)
+
+
+class CachedEncoder:
+    """
+    Drop-in wrapper around a SentenceTransformer: `encode` has the same shape
+    semantics (str → 1-D array, list → 2-D array) but only encodes cache misses.
+    Anything else (get_sentence_embedding_dimension, pools, ...) is delegated.
+    """
+
+    def __init__(self, model, model_name, cache=None):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache or EmbeddingCache()
+
+    def __getattr__(self, name):
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def _cache_key(self, normalize_embeddings=False):
+        return f"{self.model_name}:norm" if normalize_embeddings else self.model_name
+
+    def _encode_cached(self, sentences, encode_fn, normalize_embeddings=False):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        key = self._cache_key(normalize_embeddings)
+        hashes = [text_hash(t) for t in texts]
+        found = self.cache.get_many(key, hashes)
+
+        miss_idx = {}
+        for i, h in enumerate(hashes):
+            if h not in found:
+                miss_idx.setdefault(h, i)
+        if miss_idx:
+            miss_texts = [texts[i] for i in miss_idx.values()]
+            vectors = np.asarray(encode_fn(miss_texts), dtype=np.float32)
+            self.cache.put_many(key, list(miss_idx), vectors)
+            found.update(zip(miss_idx, vectors))
+
+        out = np.stack([found[h] for h in hashes])
+        return out[0] if single else out
+
+    def encode(self, sentences, normalize_embeddings=False, **kwargs):
+        kwargs.setdefault("show_progress_bar", False)
+        return self._encode_cached(
+            sentences,
+            lambda texts: self.model.encode(texts, normalize_embeddings=normalize_embeddings, **kwargs),
+            normalize_embeddings,
+        )
+
+    def encode_multi_process(self, sentences, pool, **kwargs):
+        return self._encode_cached(
+            sentences,
+            lambda texts: self.model.encode_multi_process(texts, pool, **kwargs),
+            kwargs.get("normalize_embeddings", False),
+        )
@@ -0,0 +1,124 @@
+# ingest_manifest.py
+# Small SQLite manifest of ingested files (path → mtime, size, content hash, doc id)
+# so ingest runs only parse/embed what changed since the last run.
+
+import hashlib
+import os
+import sqlite3
+from collections import namedtuple
+
+FileState = namedtuple("FileState", ["path", "mtime", "size", "content_hash"])
+ManifestEntry = namedtuple("ManifestEntry", ["path", "mtime", "size", "content_hash", "doc_id"])
+
+
+def manifest_path_for(chroma_path):
+    """Manifest lives beside the Chroma directory, e.g. chroma_db → chroma_db.manifest.sqlite"""
+    return os.path.normpath(chroma_path) + ".manifest.sqlite"
+
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+class IngestManifest:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                doc_id TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS files_doc_id ON files(doc_id)")
+        self.conn.commit()
+
+    def get(self, path):
+        row = self.conn.execute(
+            "SELECT path, mtime, size, content_hash, doc_id FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def record(self, state: FileState, doc_id):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, mtime, size, content_hash, doc_id) VALUES (?, ?, ?, ?, ?)",
+            (state.path, state.mtime, state.size, state.content_hash, doc_id),
+        )
+
+    def record_skipped(self, state: FileState):
+        """
+        Record a file that no longer yields a post (too short, no summary) and return the
+        doc ID it pointed at before, so the caller can drop it once nothing else uses it.
+        """
+        entry = self.get(state.path)
+        self.record(state, None)
+        return entry.doc_id if entry else None
+
+    def tracked_paths(self):
+        return {row[0] for row in self.conn.execute("SELECT path FROM files")}
+
+    def forget(self, paths):
+        """Drop paths from the manifest and return the doc IDs they pointed at."""
+        doc_ids = set()
+        for path in paths:
+            entry = self.get(path)
+            if entry is None:
+                continue
+            if entry.doc_id:
+                doc_ids.add(entry.doc_id)
+            self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        return doc_ids
+
+    def orphans(self, doc_ids):
+        """Subset of doc_ids no longer referenced by any tracked file."""
+        return {
+            doc_id for doc_id in doc_ids
+            if doc_id and not self.conn.execute(
+                "SELECT 1 FROM files WHERE doc_id = ? LIMIT 1", (doc_id,)
+            ).fetchone()
+        }
+
+    def paths_for(self, doc_id):
+        """Tracked paths currently pointing at doc_id."""
+        return {row[0] for row in self.conn.execute("SELECT path FROM files WHERE doc_id = ?", (doc_id,))}
+
+    def stat_changed(self, path):
+        """True when the file is new or its mtime/size differ from the manifest (no read)."""
+        st = os.stat(path)
+        entry = self.get(path)
+        return not (entry and entry.mtime == st.st_mtime and entry.size == st.st_size)
+
+    def content_changed(self, state: FileState):
+        """
+        True when state's content hash differs from the manifest. A touched file with
+        identical content only refreshes its stat in the manifest.
+        """
+        entry = self.get(state.path)
+        if entry and entry.content_hash == state.content_hash:
+            self.record(state, entry.doc_id)
+            return False
+        return True
+
+    def read_if_changed(self, path):
+        """
+        Return (FileState, raw_bytes) when the file is new or its content changed,
+        otherwise None. Unchanged mtime+size skips the read entirely.
+        """
+        if not self.stat_changed(path):
+            return None
+
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            raw = f.read()
+        state = FileState(path, st.st_mtime, st.st_size, content_hash(raw))
+        return (state, raw) if self.content_changed(state) else None
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -2,104 +2,322 @@
 
 import os
 import uuid
-from chromadb import PersistentClient
-from embed_mistral import get_embedding
+
+try:
+    from .embedding_backends import get_backend
+    from .ingest_manifest import IngestManifest, FileState, manifest_path_for
+    from .post_parser import parse_files, to_epoch, TIMESTAMP_FIELD
+    from .bm25_index import get_bm25_index
+    from .registry import get_chroma_collection
+    from .chunking import chunk_records, chunk_ids_for, is_chunk_id, parent_id_of
+    from .post_catalog import CATALOG_DIR, iter_rows, load_rows
+    from .near_duplicates import get_near_duplicate_index, minhash, merge_metadata
+except ImportError:  # run as a script from inside vector/
+    from embedding_backends import get_backend
+    from ingest_manifest import IngestManifest, FileState, manifest_path_for
+    from post_parser import parse_files, to_epoch, TIMESTAMP_FIELD
+    from bm25_index import get_bm25_index
+    from registry import get_chroma_collection
+    from chunking import chunk_records, chunk_ids_for, is_chunk_id, parent_id_of
+    from post_catalog import CATALOG_DIR, iter_rows, load_rows
+    from near_duplicates import get_near_duplicate_index, minhash, merge_metadata
 
 CHROMA_PATH = "chroma_db"
 DATA_ROOT = "../output"
+MANIFEST_PATH = manifest_path_for(CHROMA_PATH)
+ADD_BATCH_SIZE = 256     # documents per collection.add
+ID_PAGE_SIZE = 10000     # IDs per page when loading what's already stored
+CATALOG_READ_SIZE = 2048 # changed posts per body read from the catalog
 
-# ✅ New Chroma client
-chroma_client = PersistentClient(path=CHROMA_PATH)
-collection = chroma_client.get_or_create_collection(name="linkedin-posts")
+COLLECTION_NAME = "linkedin-posts"
+backend = get_backend()  # EMBED_BACKEND, default "hashing"; recorded in / checked against the collection
 
 
-def extract_body_and_metadata(txt):
-    lines = txt.splitlines()
-    metadata = {}
-    body_lines = []
+# Opened on first use, not at import: parse_files' pool workers re-import this module
+# under the spawn start method (macOS default) and must not reopen Chroma or the sidecars
+def get_collection():
+    return get_chroma_collection(CHROMA_PATH, COLLECTION_NAME, backend=backend)
 
-    in_metadata = False
-    in_body = False
 
-    for line in lines:
-        if "--- METADATA ---" in line:
-            in_metadata = True
-            continue
-        if "----------------" in line and in_metadata:
-            in_metadata = False
-            in_body = True
-            continue
+def get_bm25():
+    return get_bm25_index(CHROMA_PATH, COLLECTION_NAME)  # keyword index kept in sync with the collection
 
-        if in_metadata:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip()
-        elif in_body:
-            body_lines.append(line)
 
-    body = "\n".join(body_lines).strip()
-    return body, metadata
+def get_near_dups():
+    return get_near_duplicate_index(CHROMA_PATH, COLLECTION_NAME)  # MinHash/LSH over ingested posts
 
 
-def load_txt_files():
+def doc_id_for(content_hash):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"sha256:{content_hash}"))
+
+
+def iter_txt_paths():
     for root, dirs, files in os.walk(DATA_ROOT):
         for fname in files:
-            if not fname.endswith(".txt") or "urn_li_activity" not in fname:
+            if fname.endswith(".txt") and "urn_li_activity" in fname:
+                yield os.path.join(root, fname)
+
+
+def changed_paths(manifest, seen_paths):
+    for full_path in iter_txt_paths():
+        seen_paths.add(full_path)
+        if manifest.stat_changed(full_path):
+            yield full_path
+
+
+def skip_short(manifest, state, replaced_ids):
+    print(f"⚠️ Skipping short or metadata-only file: {os.path.basename(state.path)}")
+    previous_id = manifest.record_skipped(state)
+    if previous_id:
+        replaced_ids.add(previous_id)  # the file's earlier post goes unless another file still points at it
+
+
+def load_txt_files(manifest, seen_paths, replaced_ids):
+    """
+    Yield new or changed files only: unchanged mtime/size are skipped via the manifest,
+    the rest are read, hashed and parsed across a process pool. Files edited down to
+    nothing add the post they had to replaced_ids.
+    """
+    for record in parse_files(changed_paths(manifest, seen_paths)):
+        state = FileState(record.path, record.mtime, record.size, record.content_hash)
+        if not manifest.content_changed(state):
+            continue
+
+        body, metadata = record.body or "", record.metadata or {}
+
+        if len(body) < 30:
+            skip_short(manifest, state, replaced_ids)
+            continue
+
+        yield post_doc(state, body, metadata, manifest)
+
+
+def post_doc(state, body, metadata, manifest):
+    root, fname = os.path.split(state.path)
+    previous = manifest.get(state.path)
+    return {
+        "id": doc_id_for(state.content_hash),
+        "text": body,
+        "filename": fname,
+        "source": root,
+        "meta": metadata,
+        "state": state,
+        "previous_id": previous.doc_id if previous else None,
+        # The post this file itself was embedded as last time (None if it was a duplicate / skipped)
+        "own_previous_id": previous.doc_id if previous and previous.doc_id == doc_id_for(previous.content_hash) else None,
+    }
+
+
+def load_catalog_posts(manifest, seen_paths, replaced_ids, catalog_dir=None):
+    """
+    load_txt_files over the post catalog instead of the raw tree: first a scan of the
+    path/stat/hash columns only, then bodies + metadata for the changed posts alone.
+    """
+    catalog_dir = catalog_dir or CATALOG_DIR
+    def changed_states():
+        for row in iter_rows(catalog_dir, ["path", "mtime", "size", "post_id"]):
+            seen_paths.add(row["path"])
+            entry = manifest.get(row["path"])
+            if entry and entry.mtime == row["mtime"] and entry.size == row["size"]:
                 continue
+            state = FileState(row["path"], row["mtime"], row["size"], row["post_id"])
+            if manifest.content_changed(state):
+                yield state
 
-            full_path = os.path.join(root, fname)
-            with open(full_path, "r", encoding="utf-8") as f:
-                raw_text = f.read()
-                body, metadata = extract_body_and_metadata(raw_text)
+    states = []
 
-                if len(body) < 30:
-                    print(f"⚠️ Skipping short or metadata-only file: {fname}")
-                    continue
+    def read_bodies():
+        rows = load_rows(catalog_dir, "path", [s.path for s in states],
+                         ["body", "url", "keyword", "category", "engagementScore", "scrapedAt"])
+        for state in states:
+            row = rows[state.path]
+            body = row["body"] or ""
+            if len(body) < 30:
+                skip_short(manifest, state, replaced_ids)
+                continue
+            yield post_doc(state, body, row, manifest)
+        states.clear()
 
-                yield {
-                    "id": str(uuid.uuid5(uuid.NAMESPACE_URL, full_path)),
-                    "text": body,
-                    "filename": fname,
-                    "source": root,
-                    "meta": metadata
-                }
+    for state in changed_states():
+        states.append(state)
+        if len(states) >= CATALOG_READ_SIZE:
+            yield from read_bodies()
+    if states:
+        yield from read_bodies()
 
 
-def already_exists(doc_id):
-    try:
-        result = collection.get(ids=[doc_id])
-        return bool(result['ids'])
-    except:
-        return False
+def load_existing_ids(page_size=ID_PAGE_SIZE):
+    """
+    Fetch every stored ID once, paging so the scan never holds documents/embeddings.
+    Returns (post ids that are already chunked, whole-post ids from before chunking).
+    """
+    existing = set()
+    unchunked = set()
+    offset = 0
+    while True:
+        page = get_collection().get(include=[], limit=page_size, offset=offset)
+        ids = page["ids"]
+        if not ids:
+            break
+        for record_id in ids:
+            if is_chunk_id(record_id):
+                existing.add(parent_id_of(record_id))
+            else:
+                unchunked.add(record_id)
+        offset += len(ids)
+    return existing, unchunked
 
 
-def ingest():
+def add_batch(batch):
+    """Embed every post as overlapping chunks ("<post id>#<n>") linked back by parent_id."""
+    ids, documents, metadatas = [], [], []
+    for doc in batch:
+        # `or`, not get() defaults: catalog rows carry null columns as None, which Chroma rejects
+        meta = {
+            "filename": doc["filename"],
+            "source": doc["source"],
+            "url": doc["meta"].get("url") or "N/A",
+            "keyword": doc["meta"].get("keyword") or "",
+            "category": doc["meta"].get("category") or "Uncategorized",
+            "engagementScore": doc["meta"].get("engagementScore") or 0
+        }
+        epoch = to_epoch(doc["meta"].get("scrapedAt"))
+        if epoch is not None:
+            meta[TIMESTAMP_FIELD] = epoch  # numeric, so digests can range-filter by time
+        chunk_ids, chunk_docs, chunk_metas = chunk_records(doc["id"], doc["text"], meta)
+        ids += chunk_ids
+        documents += chunk_docs
+        metadatas += chunk_metas
+
+    get_collection().add(
+        documents=documents,
+        ids=ids,
+        metadatas=metadatas,
+        embeddings=backend.encode(documents).tolist()
+    )
+    get_bm25().upsert(ids, documents)
+    return len(ids)
+
+
+def delete_records(record_ids):
+    record_ids = list(record_ids)
+    if record_ids:
+        get_collection().delete(ids=record_ids)
+        get_bm25().delete(record_ids)
+
+
+def delete_orphans(manifest, doc_ids):
+    orphaned = manifest.orphans(doc_ids)
+    if orphaned:
+        # Chunks of the orphaned posts, plus any whole-post vectors stored under the post id itself
+        delete_records(chunk_ids_for(get_collection(), orphaned) + list(orphaned))
+        near_dups = get_near_dups()
+        near_dups.remove(orphaned)
+        near_dups.commit()
+        print(f"🗑️ Removed {len(orphaned)} stale posts")
+
+
+def merge_duplicates(merges, batch_size=500):
+    """Fold near-duplicates' keyword/category into every chunk of their canonical post."""
+    collection = get_collection()
+    canonical_ids = list(merges)
+    for i in range(0, len(canonical_ids), batch_size):
+        page = collection.get(where={"parent_id": {"$in": canonical_ids[i:i + batch_size]}}, include=["metadatas"])
+        metadatas = []
+        for meta in page["metadatas"]:
+            for duplicate in merges[meta["parent_id"]]:
+                meta = merge_metadata(meta, duplicate)
+            metadatas.append(meta)
+        if page["ids"]:
+            collection.update(ids=page["ids"], metadatas=metadatas)
+
+
+def ingest(batch_size=ADD_BATCH_SIZE):
+    manifest = IngestManifest(MANIFEST_PATH)
+    near_dups = get_near_dups()
+    existing_ids, unchunked_ids = load_existing_ids()
+    print(f"📦 {len(existing_ids)} chunked posts already in ChromaDB ({len(unchunked_ids)} unchunked)")
+
     count = 0
-    for doc in load_txt_files():
-        if already_exists(doc["id"]):
-            print(f"⏭️ Skipping duplicate: {doc['filename']}")
-            continue
+    chunk_count = 0
+    duplicate_count = 0
+    batch = []
+    replaced_ids = set()
+    rechunked_ids = set()
+    seen_paths = set()
+    merges = {}  # canonical post id → metadata of its near-duplicates seen this run
 
+    def flush():
+        nonlocal count, chunk_count
         try:
-            embedding = get_embedding(doc["text"])
-            collection.add(
-                documents=[doc["text"]],
-                ids=[doc["id"]],
-                metadatas=[{
-                    "filename": doc["filename"],
-                    "source": doc["source"],
-                    "url": doc["meta"].get("url", "N/A"),
-                    "category": doc["meta"].get("category", "Uncategorized"),
-                    "engagementScore": doc["meta"].get("engagementScore", "0")
-                }],
-                embeddings=[embedding]
-            )
-            print(f"✅ Added: {doc['filename']}")
-            count += 1
+            chunk_count += add_batch(batch)
+            for doc in batch:
+                manifest.record(doc["state"], doc["id"])
+            manifest.commit()
+            near_dups.commit()
+            existing_ids.update(doc["id"] for doc in batch)
+            count += len(batch)
+            print(f"✅ Added batch of {len(batch)} ({count} new posts, {chunk_count} chunks so far)")
         except Exception as e:
-            print(f"❌ Failed to add {doc['filename']}: {e}")
+            near_dups.rollback()
+            print(f"❌ Failed to add batch starting at {batch[0]['filename']}: {e}")
+        batch.clear()
+
+    # With CATALOG_DIR set the catalog is the source of truth (rebuild it after scraping)
+    posts = (load_catalog_posts(manifest, seen_paths, replaced_ids) if CATALOG_DIR
+             else load_txt_files(manifest, seen_paths, replaced_ids))
+    for doc in posts:
+        if doc["previous_id"] and doc["previous_id"] != doc["id"]:
+            replaced_ids.add(doc["previous_id"])
+        # IDs used to be derived from the path; drop those vectors as files get re-keyed
+        legacy_id = str(uuid.uuid5(uuid.NAMESPACE_URL, doc["state"].path))
+        if legacy_id in unchunked_ids:
+            replaced_ids.add(legacy_id)
+        # Whole-post vector from before chunking: re-embed as chunks, then drop it
+        if doc["id"] in unchunked_ids:
+            rechunked_ids.add(doc["id"])
+
+        if doc["id"] in existing_ids or any(d["id"] == doc["id"] for d in batch):
+            # Same content already embedded (moved or duplicated file)
+            manifest.record(doc["state"], doc["id"])
+            continue
+
+        # An edited file is not a duplicate of its own earlier version: leave that post out
+        # of the candidates, and drop its signature unless other files still point at it
+        own_previous = doc["own_previous_id"]
+        if own_previous and own_previous != doc["id"] and manifest.paths_for(own_previous) <= {doc["state"].path}:
+            near_dups.remove([own_previous])
+
+        # Repost / cross-post / same carousel under another keyword: point the file at the
+        # canonical post instead of embedding it again, and merge its keyword/category
+        signature = minhash(doc["text"])
+        match = near_dups.find(signature, exclude={doc["id"], own_previous}) if signature is not None else None
+        if match:
+            canonical, score = match
+            manifest.record(doc["state"], canonical)
+            merges.setdefault(canonical, []).append(doc["meta"])
+            duplicate_count += 1
+            continue
+        if signature is not None:
+            near_dups.add(doc["id"], signature)
+
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    if merges:
+        merge_duplicates(merges)
+        print(f"🪞 Collapsed {duplicate_count} near-duplicate posts into {len(merges)} canonical posts")
+
+    removed_paths = manifest.tracked_paths() - seen_paths
+    replaced_ids |= manifest.forget(removed_paths)
+    delete_orphans(manifest, replaced_ids)
+    delete_records((rechunked_ids - replaced_ids) & existing_ids)
+    manifest.close()
 
-    print(f"\n🎉 Done. Added {count} new documents to ChromaDB.")
+    print(f"\n🎉 Done. Added {count} new documents ({chunk_count} chunks) to ChromaDB ({len(removed_paths)} files removed).")
 
 
 if __name__ == "__main__":
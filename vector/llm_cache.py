@@ -0,0 +1,92 @@
+# llm_cache.py
+# Content-addressed prompt → response cache for LLM calls.
+# Key = sha256(model, prompt, generation params); stored in SQLite with
+# least-recently-used eviction once the stored responses exceed LLM_CACHE_MAX_MB.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    from .registry import get_or_create
+except ImportError:  # imported as a top-level module from inside vector/
+    from registry import get_or_create
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite")
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", 256))
+
+
+def cache_key(model, prompt, params=None):
+    blob = json.dumps({"model": model, "prompt": prompt, "params": params or {}}, sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path=LLM_CACHE_PATH, max_bytes=int(LLM_CACHE_MAX_MB * 1024 * 1024)):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access)")
+        self.conn.commit()
+
+    def get(self, model, prompt, params=None):
+        key = cache_key(model, prompt, params)
+        with self._lock:
+            row = self.conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        return row[0]
+
+    def put(self, model, prompt, response, params=None):
+        key = cache_key(model, prompt, params)
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, size, time.time()),
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            doomed.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def cached(self, model, prompt, params, generate):
+        """Return the cached response, or call generate() and cache a non-empty result."""
+        hit = self.get(model, prompt, params)
+        if hit is not None:
+            return hit
+        response = generate()
+        if response:
+            self.put(model, prompt, response, params)
+        return response
+
+
+def get_llm_cache(path=LLM_CACHE_PATH):
+    return get_or_create(("llm-cache", path), lambda: LLMCache(path))
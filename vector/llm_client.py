@@ -0,0 +1,193 @@
+# llm_client.py
+# One pooled, keep-alive client for the local Ollama server, shared by every
+# Mistral call site (RAG chatbots, digest summaries, research ranking).
+#
+# - requests.Session with a connection pool sized to the concurrency limit
+# - bounded concurrency (LLM_MAX_CONCURRENCY) across threads
+# - connect/read timeouts and retry with exponential backoff on transient errors
+# - per-call latency / token metrics (from Ollama's eval counters)
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .registry import get_or_create
+    from .llm_cache import get_llm_cache
+except ImportError:  # imported as a top-level module from inside vector/
+    from registry import get_or_create
+    from llm_cache import get_llm_cache
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 5))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", 120))
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", 3))
+LLM_BACKOFF = float(os.getenv("LLM_BACKOFF", 0.5))  # seconds, doubled per attempt
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class LLMError(requests.RequestException):
+    pass
+
+
+class LLMMetrics:
+    def __init__(self, window=1000):
+        self.calls = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, model, seconds, result=None, error=None):
+        result = result or {}
+        with self._lock:
+            self.calls.append({
+                "endpoint": endpoint,
+                "model": model,
+                "latency_s": seconds,
+                "prompt_tokens": result.get("prompt_eval_count"),
+                "completion_tokens": result.get("eval_count"),
+                "error": error,
+            })
+
+    def snapshot(self):
+        with self._lock:
+            calls = list(self.calls)
+        ok = [c for c in calls if not c["error"]]
+        latencies = sorted(c["latency_s"] for c in ok)
+        completion = sum(c["completion_tokens"] or 0 for c in ok)
+        return {
+            "calls": len(calls),
+            "errors": len(calls) - len(ok),
+            "p50_latency_s": latencies[len(latencies) // 2] if latencies else None,
+            "max_latency_s": latencies[-1] if latencies else None,
+            "prompt_tokens": sum(c["prompt_tokens"] or 0 for c in ok),
+            "completion_tokens": completion,
+            "tokens_per_s": completion / sum(latencies) if latencies and sum(latencies) else None,
+        }
+
+
+class LLMClient:
+    def __init__(self, base_url=OLLAMA_URL, model=OLLAMA_MODEL, max_concurrency=LLM_MAX_CONCURRENCY,
+                 timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT), retries=LLM_RETRIES, backoff=LLM_BACKOFF):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.metrics = LLMMetrics()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    # === LOW LEVEL ===
+    def _post(self, endpoint, payload, stream=False):
+        """POST with retry/backoff; returns an open response (caller closes it)."""
+        url = f"{self.base_url}{endpoint}"
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(url, json=payload, stream=stream, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    try:
+                        response.raise_for_status()
+                    except requests.HTTPError as e:
+                        response.close()
+                        raise LLMError(f"{endpoint} failed: {e}") from e
+                    return response
+                response.close()
+                error = requests.HTTPError(f"{response.status_code} from {url}")
+
+            if attempt >= self.retries:
+                raise LLMError(f"{endpoint} failed after {attempt + 1} attempts: {error}") from error
+            time.sleep(self.backoff * (2 ** attempt))
+
+    def _call(self, endpoint, payload):
+        start = time.perf_counter()
+        with self._slots:
+            try:
+                with self._post(endpoint, payload) as response:
+                    result = response.json()
+            except LLMError as e:
+                self.metrics.record(endpoint, payload["model"], time.perf_counter() - start, error=str(e))
+                raise
+            except (requests.RequestException, ValueError) as e:
+                self.metrics.record(endpoint, payload["model"], time.perf_counter() - start, error=str(e))
+                raise LLMError(f"{endpoint} failed while reading the response: {e}") from e
+        self.metrics.record(endpoint, payload["model"], time.perf_counter() - start, result)
+        return result
+
+    def _stream(self, endpoint, payload, extract):
+        start = time.perf_counter()
+        final = None
+        with self._slots:
+            try:
+                with self._post(endpoint, payload, stream=True) as response:
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        token = extract(chunk)
+                        if token:
+                            yield token
+                        if chunk.get("done"):
+                            final = chunk
+                            break
+            except LLMError as e:
+                self.metrics.record(endpoint, payload["model"], time.perf_counter() - start, error=str(e))
+                raise
+            except (requests.RequestException, ValueError) as e:
+                # Ollama dropping mid-answer (ChunkedEncodingError) or a malformed line
+                self.metrics.record(endpoint, payload["model"], time.perf_counter() - start, error=str(e))
+                raise LLMError(f"{endpoint} stream interrupted: {e}") from e
+        self.metrics.record(endpoint, payload["model"], time.perf_counter() - start, final)
+
+    # === PUBLIC API ===
+    def _generate_payload(self, prompt, system, model, options, stream):
+        payload = {"model": model or self.model, "prompt": prompt, "stream": stream}
+        if system:
+            payload["system"] = system
+        if options:
+            payload["options"] = options
+        return payload
+
+    def _cached(self, endpoint, payload, extract, use_cache):
+        if not use_cache:
+            return extract(self._call(endpoint, payload))
+        prompt = payload.get("prompt") or payload.get("messages")
+        params = {"endpoint": endpoint, "system": payload.get("system"), "options": payload.get("options")}
+        return get_llm_cache().cached(
+            payload["model"], json.dumps(prompt), params,
+            lambda: extract(self._call(endpoint, payload)),
+        )
+
+    def generate(self, prompt, system=None, model=None, options=None, use_cache=False):
+        """use_cache=True reuses the stored response for an identical model/prompt/options."""
+        payload = self._generate_payload(prompt, system, model, options, False)
+        return self._cached("/api/generate", payload, lambda r: r.get("response", ""), use_cache)
+
+    def stream(self, prompt, system=None, model=None, options=None):
+        """Yield the answer token-by-token (Ollama /api/generate with stream=true)."""
+        payload = self._generate_payload(prompt, system, model, options, True)
+        return self._stream("/api/generate", payload, lambda chunk: chunk.get("response"))
+
+    def chat(self, messages, model=None, options=None, use_cache=False):
+        payload = {"model": model or self.model, "messages": messages, "stream": False}
+        if options:
+            payload["options"] = options
+        return self._cached("/api/chat", payload, lambda r: r.get("message", {}).get("content", ""), use_cache)
+
+
+def get_llm_client(base_url=OLLAMA_URL, model=OLLAMA_MODEL):
+    """Process-wide shared client (one connection pool per server/model)."""
+    return get_or_create(("llm-client", base_url, model), lambda: LLMClient(base_url, model))
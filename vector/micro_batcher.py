@@ -0,0 +1,100 @@
+# micro_batcher.py
+# Async micro-batching: callers `await batcher.submit(item)`, a background task
+# gathers items for up to `max_wait_ms` (or `max_batch_size` items) and hands the
+# whole batch to one blocking `process_batch(items) -> results` call in a thread.
+
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+
+class LatencyStats:
+    """Rolling latency percentiles and throughput over the last `window` requests."""
+
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self.finished_at = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+
+    def record(self, seconds):
+        self.latencies.append(seconds)
+        self.finished_at.append(time.monotonic())
+
+    def record_batch(self, size):
+        self.batch_sizes.append(size)
+
+    def snapshot(self):
+        if not self.latencies:
+            return {"requests": 0}
+        lat_ms = np.asarray(self.latencies) * 1000
+        span = self.finished_at[-1] - self.finished_at[0]
+        return {
+            "requests": len(lat_ms),
+            "p50_ms": float(np.percentile(lat_ms, 50)),
+            "p95_ms": float(np.percentile(lat_ms, 95)),
+            "p99_ms": float(np.percentile(lat_ms, 99)),
+            "throughput_rps": len(lat_ms) / span if span > 0 else None,
+            "avg_batch_size": float(np.mean(self.batch_sizes)) if self.batch_sizes else None,
+        }
+
+
+class MicroBatcher:
+    def __init__(self, process_batch, max_batch_size=32, max_wait_ms=5.0):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = LatencyStats()
+        self._queue = None
+        self._worker = None
+
+    def _ensure_started(self):
+        # Created lazily so the queue/task bind to the server's running event loop
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item):
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        await self._queue.put((item, future))
+        try:
+            return await future
+        finally:
+            self.stats.record(time.perf_counter() - start)
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            self.stats.record_batch(len(batch))
+            items = [item for item, _ in batch]
+            try:
+                results = await asyncio.to_thread(self.process_batch, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
@@ -0,0 +1,144 @@
+# near_duplicates.py
+# Near-duplicate post detection with MinHash + LSH, so reposts, cross-posts and the
+# same carousel scraped under several keywords are embedded once.
+#
+# Each post → set of word shingles → MINHASH_PERMUTATIONS min-hashes (one numpy pass).
+# The signature is cut into LSH_BANDS bands; posts sharing any band bucket are
+# candidates, and a candidate counts as a duplicate when the estimated Jaccard
+# similarity (fraction of equal min-hashes) is at least NEAR_DUP_THRESHOLD.
+# Signatures and buckets persist in SQLite beside the Chroma directory, so incremental
+# ingests compare new posts against everything ingested before.
+
+import os
+import sqlite3
+import zlib
+
+import numpy as np
+
+try:
+    from .bm25_index import tokenize
+    from .registry import get_or_create
+except ImportError:  # imported as a top-level module from inside vector/
+    from bm25_index import tokenize
+    from registry import get_or_create
+
+SHINGLE_WORDS = 5
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 16                    # 16 bands × 8 rows: candidates from ~0.7 similarity up
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", 0.8))
+MERSENNE_PRIME = (1 << 31) - 1    # a·x + b stays below 2**63 for 32-bit shingle hashes
+MERGED_FIELDS = {"keyword": "keywords", "category": "categories"}
+
+# Fixed seed: signatures are stored, so the permutations must never change between runs
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def near_dup_path_for(chroma_path, collection_name):
+    """Index lives beside the Chroma directory, one file per collection."""
+    return f"{os.path.normpath(chroma_path)}.{collection_name}.neardup.sqlite"
+
+
+def shingles(text, size=SHINGLE_WORDS):
+    words = tokenize(text)
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(text):
+    """MinHash signature (uint32 array) of text's shingles; None for text without words."""
+    grams = shingles(text)
+    if not grams:
+        return None
+    x = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+    return ((_A[:, None] * x[None, :] + _B[:, None]) % MERSENNE_PRIME).min(axis=1).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def band_keys(signature, bands=LSH_BANDS):
+    return [(band, rows.tobytes()) for band, rows in enumerate(np.array_split(signature, bands))]
+
+
+def merge_metadata(canonical, duplicate):
+    """
+    Fold a duplicate's keyword/category into the canonical post's metadata as
+    comma-joined keywords/categories (Chroma has no list values) and count it.
+    """
+    merged = dict(canonical)
+    for field, plural in MERGED_FIELDS.items():
+        values = [v for v in (merged.get(plural) or merged.get(field) or "").split(", ") if v]
+        extra = duplicate.get(field)
+        if extra and extra not in values:
+            values.append(extra)
+        if values:
+            merged[plural] = ", ".join(values)
+    merged["duplicates"] = int(merged.get("duplicates", 0)) + 1
+    return merged
+
+
+class NearDuplicateIndex:
+    def __init__(self, db_path, threshold=NEAR_DUP_THRESHOLD):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS signatures (doc_id TEXT PRIMARY KEY, signature BLOB NOT NULL);
+            CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, bucket BLOB NOT NULL, doc_id TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS buckets_band ON buckets(band, bucket);
+            CREATE INDEX IF NOT EXISTS buckets_doc ON buckets(doc_id);
+        """)
+        self.conn.commit()
+
+    def _signature(self, doc_id):
+        row = self.conn.execute("SELECT signature FROM signatures WHERE doc_id = ?", (doc_id,)).fetchone()
+        return np.frombuffer(row[0], dtype=np.uint32) if row else None
+
+    def find(self, signature, exclude=()):
+        """(doc_id, similarity) of the most similar indexed post at/above threshold, else None."""
+        candidates = set()
+        for band, bucket in band_keys(signature):
+            candidates.update(row[0] for row in self.conn.execute(
+                "SELECT doc_id FROM buckets WHERE band = ? AND bucket = ?", (band, bucket)))
+        candidates.difference_update(exclude)
+
+        best = None
+        for doc_id in candidates:
+            score = similarity(signature, self._signature(doc_id))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (doc_id, score)
+        return best
+
+    def add(self, doc_id, signature):
+        self.remove([doc_id])
+        self.conn.execute("INSERT INTO signatures (doc_id, signature) VALUES (?, ?)", (doc_id, signature.tobytes()))
+        self.conn.executemany("INSERT INTO buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                              [(band, bucket, doc_id) for band, bucket in band_keys(signature)])
+
+    def remove(self, doc_ids):
+        for doc_id in doc_ids:
+            self.conn.execute("DELETE FROM signatures WHERE doc_id = ?", (doc_id,))
+            self.conn.execute("DELETE FROM buckets WHERE doc_id = ?", (doc_id,))
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def get_near_duplicate_index(chroma_path, collection_name):
+    """Shared per-process index for the given Chroma collection."""
+    return get_or_create(
+        ("near-dup", chroma_path, collection_name),
+        lambda: NearDuplicateIndex(near_dup_path_for(chroma_path, collection_name)),
+    )
@@ -0,0 +1,278 @@
+# post_catalog.py
+# Columnar post catalog: scraped posts, their header metadata, summaries and summary
+# embeddings compacted into Parquet, hive-partitioned by keyword and month:
+#
+#   <catalog_dir>/keyword=<keyword>/month=<YYYY-MM>/part-<n>-<i>.parquet
+#
+# One row per post (see schema()). Downstream stages read it with column projection and
+# pushed-down filters instead of re-opening thousands of .txt / .json files, e.g. a
+# digest scan reads only category + engagementScore, then the bodies of the winners.
+#
+# pyarrow is optional for the rest of the repo and only imported here, on first use.
+#
+# Build / refresh (full rewrite, swapped in atomically; embeddings are reused by hash):
+#   python vector/post_catalog.py <raw_root> <catalog_dir> [--summaries DIR ...]
+#       [--metadata FILE ...] [--embed-backend sentence-transformers:all-MiniLM-L6-v2]
+
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+try:
+    from .post_parser import parse_tree
+    from .topk import TopKPerKey
+except ImportError:  # imported as a top-level module from inside vector/
+    from post_parser import parse_tree
+    from topk import TopKPerKey
+
+CATALOG_DIR = os.getenv("CATALOG_DIR")   # unset → stages keep reading files / Chroma
+CATALOG_BATCH_ROWS = 50000               # rows buffered per write (memory bound while compacting)
+PARTITION_COLUMNS = ["keyword", "month"]
+NO_KEYWORD = "unknown"
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("The post catalog needs pyarrow: pip install pyarrow") from e
+    return pa, ds, pq
+
+
+def schema():
+    pa, _, _ = _arrow()
+    return pa.schema([
+        ("post_id", pa.string()),             # content hash of the raw file
+        ("path", pa.string()),
+        ("filename", pa.string()),
+        ("mtime", pa.float64()),
+        ("size", pa.int64()),
+        ("url", pa.string()),
+        ("author", pa.string()),
+        ("category", pa.string()),
+        ("sentiment", pa.string()),
+        ("likeCount", pa.int64()),
+        ("commentCount", pa.int64()),
+        ("shareCount", pa.int64()),
+        ("engagementScore", pa.float64()),
+        ("ocrExtracted", pa.bool_()),
+        ("scrapedAt", pa.timestamp("us", tz="UTC")),
+        ("body", pa.large_string()),
+        ("summary", pa.string()),
+        ("embedding", pa.list_(pa.float32())),   # embedding of `summary`
+        ("embedding_backend", pa.string()),
+        ("keyword", pa.string()),                # partition
+        ("month", pa.string()),                  # partition, YYYY-MM of scrapedAt
+    ])
+
+
+# === BUILD ===
+def load_summaries(summary_dirs):
+    """Summary JSON files → {<file stem> or <url>: summary}. Read once, here only."""
+    summaries = {}
+    for summary_dir in summary_dirs:
+        for file in Path(summary_dir).glob("*.json"):
+            with open(file, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("summary"):
+                summaries[file.stem] = data["summary"]   # summarizer.py names outputs after the .txt
+                if data.get("url"):
+                    summaries[data["url"]] = data["summary"]
+    return summaries
+
+
+def load_metadata_maps(metadata_paths):
+    merged = {}
+    for path in metadata_paths:
+        with open(path, encoding="utf-8") as f:
+            merged.update(json.load(f))  # {filename: metadata}
+    return merged
+
+
+def previous_embeddings(catalog_dir):
+    """{(post_id, summary): (embedding, backend)} from the current catalog, so rebuilds don't re-encode."""
+    if not os.path.isdir(catalog_dir):
+        return {}
+    reused = {}
+    for row in iter_rows(catalog_dir, ["post_id", "summary", "embedding", "embedding_backend"],
+                         filter_expr=_field("embedding").is_valid()):
+        reused[(row["post_id"], row["summary"])] = (row["embedding"], row["embedding_backend"])
+    return reused
+
+
+def _field(name):
+    _, ds, _ = _arrow()
+    return ds.field(name)
+
+
+def catalog_row(record, summaries, metadata_map):
+    meta = {**metadata_map.get(os.path.basename(record.path), {}), **(record.metadata or {})}
+    scraped_at = meta.get("scrapedAt")
+    filename = os.path.basename(record.path)
+    return {
+        "post_id": record.content_hash,
+        "path": record.path,
+        "filename": filename,
+        "mtime": record.mtime,
+        "size": record.size,
+        "url": meta.get("url"),
+        "author": meta.get("author"),
+        "category": meta.get("category") or "Uncategorized",
+        "sentiment": meta.get("sentiment"),
+        "likeCount": meta.get("likeCount"),
+        "commentCount": meta.get("commentCount"),
+        "shareCount": meta.get("shareCount"),
+        "engagementScore": meta.get("engagementScore"),
+        "ocrExtracted": meta.get("ocrExtracted"),
+        "scrapedAt": scraped_at,
+        "body": record.body,
+        "summary": summaries.get(Path(filename).stem) or summaries.get(meta.get("url")),
+        "embedding": None,
+        "embedding_backend": None,
+        "keyword": meta.get("keyword") or NO_KEYWORD,
+        "month": scraped_at.strftime("%Y-%m") if scraped_at else "unknown",
+    }
+
+
+def _write_batch(rows, out_dir, part, backend, reused):
+    pa, ds, _ = _arrow()
+    if backend is not None:
+        missing = []
+        for row in rows:
+            hit = reused.get((row["post_id"], row["summary"]))
+            if hit and hit[1] == backend.name:
+                row["embedding"], row["embedding_backend"] = hit
+            elif row["summary"]:
+                missing.append(row)
+        if missing:
+            vectors = backend.encode([row["summary"] for row in missing])
+            for row, vector in zip(missing, vectors):
+                row["embedding"], row["embedding_backend"] = vector.tolist(), backend.name
+
+    table = pa.Table.from_pylist(rows, schema=schema())
+    ds.write_dataset(
+        table, out_dir, format="parquet",
+        partitioning=ds.partitioning(pa.schema([(c, pa.string()) for c in PARTITION_COLUMNS]), flavor="hive"),
+        basename_template=f"part-{part}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def build_catalog(raw_root, catalog_dir, summary_dirs=(), metadata_paths=(), backend=None,
+                  match=lambda fname: fname.endswith(".txt") and "urn_li_activity" in fname):
+    """
+    Compact every scraped post under raw_root (+ summaries, metadata maps and, with a
+    backend, summary embeddings) into a fresh catalog, then swap it in. Returns the row count.
+    """
+    summaries = load_summaries(summary_dirs)
+    metadata_map = load_metadata_maps(metadata_paths)
+    reused = previous_embeddings(catalog_dir) if backend is not None else {}
+
+    staging = catalog_dir.rstrip("/") + ".building"
+    shutil.rmtree(staging, ignore_errors=True)
+    rows, part, total = [], 0, 0
+    for record in parse_tree(raw_root, match=match):
+        if record.metadata is None:
+            continue
+        rows.append(catalog_row(record, summaries, metadata_map))
+        if len(rows) >= CATALOG_BATCH_ROWS:
+            _write_batch(rows, staging, part, backend, reused)
+            total += len(rows)
+            rows, part = [], part + 1
+    if rows:
+        _write_batch(rows, staging, part, backend, reused)
+        total += len(rows)
+
+    if total:
+        old = catalog_dir.rstrip("/") + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.isdir(catalog_dir):
+            os.rename(catalog_dir, old)
+        os.rename(staging, catalog_dir)
+        shutil.rmtree(old, ignore_errors=True)
+    return total
+
+
+# === READ ===
+def dataset(catalog_dir):
+    pa, ds, _ = _arrow()
+    return ds.dataset(catalog_dir, format="parquet", schema=schema(), partitioning="hive")
+
+
+def where_to_expression(where):
+    """
+    Chroma-style where ({"col": value}, {"col": {"$in"|"$nin"|"$ne"|"$gte"|...: v}},
+    {"$and"|"$or": [where, ...]}) → dataset filter.
+    """
+    if not where:
+        return None
+    ops = {
+        "$eq": lambda f, v: f == v, "$ne": lambda f, v: f != v,
+        "$gt": lambda f, v: f > v, "$gte": lambda f, v: f >= v,
+        "$lt": lambda f, v: f < v, "$lte": lambda f, v: f <= v,
+        "$in": lambda f, v: f.isin(v), "$nin": lambda f, v: ~f.isin(v),
+    }
+    expression = None
+    for column, condition in where.items():
+        if column in ("$and", "$or"):
+            terms = [where_to_expression(w) for w in condition]
+            term = terms[0]
+            for t in terms[1:]:
+                term = term & t if column == "$and" else term | t
+            expression = term if expression is None else expression & term
+            continue
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, value in condition.items():
+            term = ops[op](_field(column), value)
+            expression = term if expression is None else expression & term
+    return expression
+
+
+def iter_rows(catalog_dir, columns, where=None, filter_expr=None):
+    """Yield dicts holding only `columns`; `where` and partition columns are pushed down to the scan."""
+    expression = where_to_expression(where)
+    if filter_expr is not None:
+        expression = filter_expr if expression is None else expression & filter_expr
+    for batch in dataset(catalog_dir).to_batches(columns=list(columns), filter=expression):
+        yield from batch.to_pylist()
+
+
+def load_rows(catalog_dir, key_column, keys, columns):
+    """Fetch rows whose key_column is in keys → {key: row}."""
+    keys = list(keys)
+    if not keys:
+        return {}
+    columns = list(dict.fromkeys([key_column, *columns]))
+    return {row[key_column]: row for row in iter_rows(catalog_dir, columns, where={key_column: {"$in": keys}})}
+
+
+def rank_by_category(catalog_dir, top_n, where=None, score_column="engagementScore"):
+    """Top-n post paths per category, reading only path/category/score columns."""
+    ranker = TopKPerKey(top_n)
+    for row in iter_rows(catalog_dir, ["path", "category", score_column], where=where):
+        ranker.push(row["category"], row[score_column] or 0.0, row["path"])
+    return ranker
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python post_catalog.py <raw_root> <catalog_dir> [--summaries DIR ...] "
+              "[--metadata FILE ...] [--embed-backend SPEC]")
+        sys.exit(1)
+
+    def values(flag):
+        return [sys.argv[i + 1] for i, arg in enumerate(sys.argv[:-1]) if arg == flag]
+
+    backend = None
+    if values("--embed-backend"):
+        from embedding_backends import get_backend
+        backend = get_backend(values("--embed-backend")[0])
+
+    raw_root, catalog_dir = sys.argv[1], sys.argv[2]
+    count = build_catalog(raw_root, catalog_dir, values("--summaries"), values("--metadata"), backend)
+    print(f"✅ Catalogued {count} posts → {catalog_dir}")
@@ -0,0 +1,202 @@
+# post_parser.py
+# The one parser for the scraper's .txt output:
+#
+#   --- METADATA ---
+#   key: value
+#   ...
+#   ----------------
+#   post body (+ OCR / external link blocks)
+#
+# Parsing streams line by line and stops as soon as it has what was asked for
+# (header only, or header + body). Values are typed (counts → int, engagementScore →
+# float, flags → bool, scrapedAt → datetime, externalLinks → list). parse_files /
+# parse_tree fan the work out over a process pool for large trees.
+
+import io
+import os
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+try:
+    from .ingest_manifest import content_hash
+except ImportError:  # imported as a top-level module from inside vector/
+    from ingest_manifest import content_hash
+
+HEADER_START = "--- METADATA ---"
+HEADER_END = "----------------"
+
+INT_FIELDS = {"likeCount", "commentCount", "shareCount"}
+FLOAT_FIELDS = {"engagementScore"}
+BOOL_FIELDS = {"videoDownloaded", "ocrExtracted"}
+DATETIME_FIELDS = {"scrapedAt", "timestamp"}
+LIST_FIELDS = {"externalLinks"}
+
+TIMESTAMP_FIELD = "timestampEpoch"   # scrapedAt as int epoch seconds: Chroma can range-filter numbers only
+
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+PARSE_CHUNK_SIZE = 256   # files per task sent to a pool worker
+
+# metadata/body are None for files without a header; body is None when only the header was read
+PostRecord = namedtuple("PostRecord", ["path", "metadata", "body", "mtime", "size", "content_hash"])
+
+
+def parse_datetime(value):
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def to_epoch(value):
+    """datetime / ISO string / number → int epoch seconds (None when missing or unparseable)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = parse_datetime(value)
+        if value is None:
+            return None
+    return int(value.timestamp())
+
+
+def typed_value(key, value):
+    """Convert one header value; unparseable or empty typed fields become None."""
+    try:
+        if key in INT_FIELDS:
+            return int(float(value)) if value else None
+        if key in FLOAT_FIELDS:
+            return float(value) if value else None
+    except ValueError:
+        return None
+    if key in BOOL_FIELDS:
+        return value.lower() == "true"
+    if key in DATETIME_FIELDS:
+        return parse_datetime(value) if value else None
+    if key in LIST_FIELDS:
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return value
+
+
+def parse_lines(lines, with_body=True):
+    """
+    Parse an iterable of lines → (metadata, body). Returns None when there is no
+    METADATA header. With with_body=False nothing after the header is consumed.
+    """
+    lines = iter(lines)
+    for line in lines:
+        if HEADER_START in line:
+            break
+    else:
+        return None
+
+    metadata = {}
+    for line in lines:
+        if line.startswith(HEADER_END):
+            break
+        if ":" in line:
+            key, value = line.split(":", 1)
+            key = key.strip()
+            metadata[key] = typed_value(key, value.strip())
+
+    body = "".join(lines).strip() if with_body else None
+    return metadata, body
+
+
+def parse_text(text, with_body=True):
+    return parse_lines(io.StringIO(text), with_body)
+
+
+def parse_file(path, with_body=True):
+    """PostRecord for one file (metadata None without a header). Full reads also hash the raw bytes."""
+    st = os.stat(path)
+    if not with_body:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            parsed = parse_lines(f, with_body=False)
+        digest = None
+    else:
+        with open(path, "rb") as f:
+            raw = f.read()
+        parsed = parse_text(raw.decode("utf-8", errors="replace"))
+        digest = content_hash(raw)
+    metadata, body = parsed if parsed is not None else (None, None)
+    return PostRecord(path, metadata, body, st.st_mtime, st.st_size, digest)
+
+
+def _parse_chunk(paths, with_body):
+    records = []
+    for path in paths:
+        try:
+            records.append(parse_file(path, with_body))
+        except (OSError, UnicodeError) as e:
+            print(f"⚠️ Could not parse {path}: {e}")
+    return records
+
+
+def _chunks(paths, size):
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_files(paths, with_body=True, workers=PARSE_WORKERS, chunk_size=PARSE_CHUNK_SIZE):
+    """
+    Parse many files across a process pool, yielding PostRecords in input order
+    (unreadable files are reported and skipped). `paths` may be a lazy iterator: only
+    a bounded number of chunks are in flight, so memory stays flat on very large trees.
+    Fewer than chunk_size files are parsed inline without starting a pool.
+    """
+    chunks = _chunks(paths, chunk_size)
+    first = next(chunks, [])
+    if workers <= 1 or len(first) < chunk_size:
+        yield from _parse_chunk(first, with_body)
+        for chunk in chunks:
+            yield from _parse_chunk(chunk, with_body)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque([pool.submit(_parse_chunk, first, with_body)])
+        for chunk in chunks:
+            in_flight.append(pool.submit(_parse_chunk, chunk, with_body))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def iter_post_paths(root, match=lambda fname: fname.endswith(".txt")):
+    for dirpath, _, files in os.walk(root):
+        for fname in files:
+            if match(fname):
+                yield os.path.join(dirpath, fname)
+
+
+def parse_tree(root, match=lambda fname: fname.endswith(".txt"), with_body=True, workers=PARSE_WORKERS):
+    """os.walk fan-out: every matching file under root → PostRecord."""
+    return parse_files(iter_post_paths(root, match), with_body=with_body, workers=workers)
+
+
+def to_chroma_metadata(metadata):
+    """
+    Chroma only stores str/int/float/bool: datetimes → ISO strings, lists joined, None
+    dropped. scrapedAt is also stored as TIMESTAMP_FIELD for range filters.
+    """
+    flat = {}
+    for key, value in metadata.items():
+        if value is None:
+            continue
+        if key == "scrapedAt" and isinstance(value, datetime):
+            flat[TIMESTAMP_FIELD] = to_epoch(value)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, list):
+            value = ", ".join(value)
+        flat[key] = value
+    return flat
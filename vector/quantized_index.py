@@ -0,0 +1,234 @@
+# quantized_index.py
+# Read-only, memory-mapped vector index exported from a Chroma collection.
+#
+# Layout of an index directory:
+#   vectors.npy     int8 (per-row symmetric scale) or float16 embeddings, L2-normalised first
+#   scales.npy      float32 per-row scale (int8 only)
+#   columns.arrow   Arrow IPC file: ids, documents and one column per metadata key
+#   info.json       dtype, dim, count, source collection, embedding backend
+#
+# Vectors and columns are both memory-mapped, so many uvicorn workers share one
+# page-cache copy of everything; `where` filters and id lookups run as Arrow compute
+# kernels over the mapped columns. Search is brute-force cosine over the matrix in
+# blocks. query()/get() mirror the Chroma collection API, so callers can swap it in
+# (VECTOR_INDEX_DIR). Needs pyarrow (imported on first use).
+#
+# Export:  python vector/quantized_index.py <chroma_path> <collection_name> <out_dir> [--float16] [--legacy]
+
+import json
+import os
+import sys
+
+import numpy as np
+
+try:
+    from .chroma_scan import iter_pages
+    from .registry import get_or_create
+    from .embedding_backends import EmbeddingMismatchError
+except ImportError:  # imported as a top-level module from inside vector/
+    from chroma_scan import iter_pages
+    from registry import get_or_create
+    from embedding_backends import EmbeddingMismatchError
+
+SEARCH_BLOCK_ROWS = 65536
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError as e:
+        raise ImportError("The quantized index needs pyarrow: pip install pyarrow") from e
+    return pa, pc
+
+
+def _normalise(matrix):
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def _column(pa, values):
+    """Arrow array for one metadata key; keys whose values mix types are stored as strings."""
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def export_collection(collection, out_dir, dtype="int8", page_size=1000, source=None):
+    """Stream a Chroma collection into a quantised index directory. Returns the row count."""
+    pa, _ = _arrow()
+    os.makedirs(out_dir, exist_ok=True)
+    ids, documents, metadatas = [], [], []
+    blocks, scale_blocks = [], []
+
+    for page in iter_pages(collection, include=["documents", "metadatas", "embeddings"], page_size=page_size):
+        vectors = _normalise(np.asarray(page["embeddings"], dtype=np.float32))
+        if dtype == "int8":
+            scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+            blocks.append(np.round(vectors / scales[:, None]).astype(np.int8))
+            scale_blocks.append(scales.astype(np.float32))
+        else:
+            blocks.append(vectors.astype(np.float16))
+        ids.extend(page["ids"])
+        documents.extend(page["documents"])
+        metadatas.extend(meta or {} for meta in page["metadatas"])
+
+    # Columnar sidecar: one column per metadata key, aligned with the vector rows
+    keys = sorted({key for meta in metadatas for key in meta} - {"ids", "documents"})
+    columns = {"ids": pa.array(ids, type=pa.string()), "documents": pa.array(documents, type=pa.large_string())}
+    columns.update({key: _column(pa, [meta.get(key) for meta in metadatas]) for key in keys})
+    table = pa.table(columns)
+
+    count = len(ids)
+    dim = blocks[0].shape[1] if blocks else 0
+    np.save(os.path.join(out_dir, "vectors.npy"),
+            np.concatenate(blocks) if blocks else np.empty((0, 0), dtype=dtype))
+    if dtype == "int8":
+        np.save(os.path.join(out_dir, "scales.npy"),
+                np.concatenate(scale_blocks) if scale_blocks else np.empty(0, dtype=np.float32))
+    with pa.OSFile(os.path.join(out_dir, "columns.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    # The backend label check_collection_backend recorded on the collection, checked on load
+    recorded = dict(getattr(collection, "metadata", None) or {})
+    with open(os.path.join(out_dir, "info.json"), "w", encoding="utf-8") as f:
+        json.dump({"dtype": dtype, "dim": int(dim), "count": count, "source": source,
+                   "embedding_backend": recorded.get("embedding_backend")}, f, indent=2)
+    return count
+
+
+class QuantizedIndex:
+    def __init__(self, index_dir, backend=None):
+        pa, _ = _arrow()
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "info.json"), encoding="utf-8") as f:
+            self.info = json.load(f)
+        if backend is not None:
+            self.check_backend(backend)
+        self.vectors = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r")
+        self.scales = (np.load(os.path.join(index_dir, "scales.npy"), mmap_mode="r")
+                       if self.info["dtype"] == "int8" else None)
+        columns_path = os.path.join(index_dir, "columns.arrow")
+        if not os.path.exists(columns_path):
+            raise FileNotFoundError(f"{columns_path} missing: re-export the index with this version")
+        # Zero-copy: the table's buffers point into the memory map
+        self.columns = pa.ipc.open_file(pa.memory_map(columns_path, "r")).read_all()
+        self.meta_keys = [k for k in self.columns.column_names if k not in ("ids", "documents")]
+
+    def check_backend(self, backend):
+        """Same guard as check_collection_backend: the query model must match the stored vectors."""
+        recorded = self.info.get("embedding_backend")
+        if (recorded is not None and recorded != backend.name) or int(self.info["dim"]) != backend.dim:
+            raise EmbeddingMismatchError(
+                f"Index '{self.index_dir}' was built with {recorded} ({self.info['dim']}-d); "
+                f"opened with {backend.name} ({backend.dim}-d)"
+            )
+
+    def __len__(self):
+        return self.info["count"]
+
+    def _scores(self, query):
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SEARCH_BLOCK_ROWS):
+            block = np.asarray(self.vectors[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+            block_scores = block @ query
+            if self.scales is not None:
+                block_scores *= self.scales[start:start + SEARCH_BLOCK_ROWS]
+            scores[start:start + len(block)] = block_scores
+        return scores
+
+    def metadata(self, row):
+        meta = {k: self.columns.column(k)[row].as_py() for k in self.meta_keys}
+        return {k: v for k, v in meta.items() if v is not None}
+
+    def _rows(self, rows, include):
+        rows = np.asarray(rows, dtype=np.int64)
+        return {
+            "ids": self.columns.column("ids").take(rows).to_pylist(),
+            "documents": self.columns.column("documents").take(rows).to_pylist() if "documents" in include else None,
+            "metadatas": [self.metadata(row) for row in rows] if "metadatas" in include else None,
+        }
+
+    def _mask(self, where):
+        """Chroma-style where ({"k": v}, {"k": {"$in"|"$ne"|"$gte"|...: v}}, {"$and"|"$or": [...]}) → bool array."""
+        _, pc = _arrow()
+        ops = {
+            "$eq": pc.equal, "$ne": pc.not_equal,
+            "$gt": pc.greater, "$gte": pc.greater_equal, "$lt": pc.less, "$lte": pc.less_equal,
+            "$in": lambda col, v: pc.is_in(col, value_set=_value_set(col, v)),
+            "$nin": lambda col, v: pc.invert(pc.is_in(col, value_set=_value_set(col, v))),
+        }
+        mask = np.ones(len(self), dtype=bool)
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                masks = [self._mask(w) for w in condition]
+                mask &= np.logical_and.reduce(masks) if key == "$and" else np.logical_or.reduce(masks)
+                continue
+            if key not in self.columns.column_names:
+                return np.zeros(len(self), dtype=bool)  # like Chroma: no value, no match
+            column = self.columns.column(key)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, value in condition.items():
+                mask &= pc.fill_null(ops[op](column, value), False).to_numpy(zero_copy_only=False)
+        return mask
+
+    def get(self, ids=None, where=None, include=("documents", "metadatas")):
+        """Chroma-shaped collection.get(ids=..., where=...) over the mapped columns."""
+        _, pc = _arrow()
+        mask = np.ones(len(self), dtype=bool) if ids is None else None
+        if ids is not None:
+            # Position of each stored id in `ids` (null when not asked for) → rows in request order
+            position = pc.index_in(self.columns.column("ids"), value_set=_value_set(self.columns.column("ids"), ids))
+            position = pc.fill_null(position, -1).to_numpy(zero_copy_only=False)
+            mask = position >= 0
+        if where:
+            mask &= self._mask(where)
+        rows = np.flatnonzero(mask)
+        if ids is not None:
+            rows = rows[np.argsort(position[rows], kind="stable")]
+        return self._rows(rows, include)
+
+    def query(self, query_embeddings, n_results=10, where=None):
+        """Chroma-shaped result dict (ids/documents/metadatas/distances), cosine distance."""
+        mask = self._mask(where) if where else None
+
+        out = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query in np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)):
+            scores = self._scores(query / max(np.linalg.norm(query), 1e-12))
+            if mask is not None:
+                scores[~mask] = -np.inf
+            k = min(n_results, int(np.isfinite(scores).sum()))
+            top = np.argpartition(-scores, k - 1)[:k] if k else np.empty(0, dtype=int)
+            top = top[np.argsort(-scores[top])]
+            rows = self._rows(top, ("documents", "metadatas"))
+            out["ids"].append(rows["ids"])
+            out["documents"].append(rows["documents"])
+            out["metadatas"].append(rows["metadatas"])
+            out["distances"].append([float(1 - scores[i]) for i in top])
+        return out
+
+
+def _value_set(column, values):
+    pa, _ = _arrow()
+    return pa.array(list(values), type=column.type)
+
+
+def get_quantized_index(index_dir, backend=None):
+    """Shared index; with an embedding `backend` the recorded backend/dimension is checked on load."""
+    return get_or_create(("quantized-index", index_dir), lambda: QuantizedIndex(index_dir, backend))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("Usage: python quantized_index.py <chroma_path> <collection_name> <out_dir> [--float16] [--legacy]")
+        sys.exit(1)
+
+    from registry import get_chroma_collection
+
+    chroma_path, collection_name, out_dir = sys.argv[1:4]
+    collection = get_chroma_collection(chroma_path, collection_name, legacy="--legacy" in sys.argv)
+    dtype = "float16" if "--float16" in sys.argv else "int8"
+    count = export_collection(collection, out_dir, dtype=dtype, source=f"{chroma_path}:{collection_name}")
+    print(f"✅ Exported {count} vectors ({dtype}) → {out_dir}")
@@ -0,0 +1,78 @@
+# registry.py
+# Process-wide, lazy registry for heavy resources (embedding models, Chroma
+# clients, HF pipelines). Nothing is imported or loaded until first use, and
+# every entry point asking for the same name/path gets the same instance.
+
+import threading
+
+try:
+    from .embedding_cache import CachedEncoder
+except ImportError:  # imported as a top-level module from inside vector/
+    from embedding_cache import CachedEncoder
+
+_resources = {}
+_lock = threading.RLock()
+
+
+def get_or_create(key, factory):
+    """Return the resource registered under `key`, building it with `factory()` once."""
+    resource = _resources.get(key)
+    if resource is not None:
+        return resource
+    with _lock:
+        if key not in _resources:
+            _resources[key] = factory()
+        return _resources[key]
+
+
+# === EMBEDDING MODELS ===
+def get_sentence_transformer(model_name):
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    return get_or_create(("sentence-transformer", model_name), load)
+
+
+def get_embedder(model_name):
+    """SentenceTransformer wrapped in the shared embedding cache."""
+    return get_or_create(
+        ("embedder", model_name),
+        lambda: CachedEncoder(get_sentence_transformer(model_name), model_name),
+    )
+
+
+# === CHROMA ===
+def get_chroma_client(path):
+    def load():
+        import chromadb
+        return chromadb.PersistentClient(path=path)
+    return get_or_create(("chroma-persistent", path), load)
+
+
+def get_legacy_chroma_client(persist_directory):
+    """Old-style duckdb-backed client used by the summary pipeline (.chromadb_store)."""
+    def load():
+        import chromadb
+        from chromadb.config import Settings
+        return chromadb.Client(Settings(chroma_db_impl="duckdb", persist_directory=persist_directory))
+    return get_or_create(("chroma-legacy", persist_directory), load)
+
+
+def get_chroma_collection(path, name, legacy=False, backend=None):
+    """
+    Shared collection handle. With an embedding `backend`, the collection's recorded
+    backend/dimension is checked on first open (EmbeddingMismatchError on mismatch).
+    """
+    client = get_legacy_chroma_client(path) if legacy else get_chroma_client(path)
+    kind = "legacy" if legacy else "persistent"
+
+    def load():
+        collection = client.get_or_create_collection(name)
+        if backend is not None:
+            try:
+                from .embedding_backends import check_collection_backend
+            except ImportError:
+                from embedding_backends import check_collection_backend
+            check_collection_backend(collection, backend)
+        return collection
+    return get_or_create(("chroma-collection", kind, path, name), load)
@@ -4,42 +4,88 @@ from chromadb.config import Settings
 from chromadb import PersistentClient
 from config import CHROMA_PATH
 from summarize_category import summarize_category
-from collections import defaultdict
+from chroma_scan import iter_collection
+from topk import TopKPerKey
+from chunking import load_full_posts
+from post_catalog import CATALOG_DIR, rank_by_category, load_rows
+from time_window import resolve_window, and_where, chroma_window_where, catalog_window_where, describe_window
+from concurrent.futures import ThreadPoolExecutor
 import os
 from urllib.parse import quote
 
+TOP_N = 5
+
 # Init Chroma client
 chroma = PersistentClient(path=CHROMA_PATH)
 collection = chroma.get_or_create_collection(name="linkedin-posts")
-results = collection.get(include=["documents", "metadatas"])
-
-total_docs = len(results["documents"])
-print(f"\n✅ Total documents fetched: {total_docs}")
-if total_docs == 0:
-    print("❌ No documents found in collection. Did you run the ingestion?")
-    exit(1)
 
-by_category = defaultdict(list)
-
-for doc, meta in zip(results["documents"], results["metadatas"]):
-    cat = meta.get("category", "Uncategorized")
-    score = int(meta.get("engagementScore", 0))
+def post_url_for(meta):
     url = meta.get("post_url") or ""
     if not url:
         urn = meta.get("filename", "").replace(".txt", "")
         if urn.startswith("urn_li_activity_"):
             activity_id = urn.replace("urn_li_activity_", "").split("_")[0]
             url = f"https://www.linkedin.com/feed/update/urn:li:activity:{activity_id}"
-            meta["post_url"] = url
-    if len(doc.strip()) < 30 or not url:
-        print(f"⏩ Skipping doc (short or no URL): {meta.get('filename')}")
-        continue
-    by_category[cat].append((score, doc, meta))
+    return url
+
+CATEGORIZED = {"category": {"$ne": "Uncategorized"}}
+
+# Only posts scraped in the digest window (DIGEST_WINDOW_DAYS, default the last 7 days)
+window = resolve_window()
+print(f"🗓️ Window: {describe_window(*window)}")
+
+if CATALOG_DIR:
+    # Columnar catalog: scan only path/category/score columns (keyed by path)
+    ranker = rank_by_category(CATALOG_DIR, TOP_N, where=and_where(CATEGORIZED, catalog_window_where(*window)))
+    total_docs = sum(ranker.counts.values())
+else:
+    # Stream metadata only (no document bodies) page by page, ranking (score, id) per category
+    ranker = TopKPerKey(TOP_N)
+    total_docs = 0
+
+    where = and_where(CATEGORIZED, chroma_window_where(*window))
+    for doc_id, _, meta in iter_collection(collection, where=where, include=["metadatas"]):
+        if meta.get("chunk_index", 0):
+            continue  # one entry per post: rank its first chunk
+        total_docs += 1
+        if not post_url_for(meta):
+            print(f"⏩ Skipping doc (no URL): {meta.get('filename')}")
+            continue
+        ranker.push(meta.get("category", "Uncategorized"), int(meta.get("engagementScore", 0)), doc_id)
+
+print(f"\n✅ Total categorized documents scanned: {total_docs}")
+if total_docs == 0:
+    print(f"❌ No documents found in collection for {describe_window(*window)}. Did you run the ingestion?")
+    exit(1)
 
 print(f"\n[INFO] Categories found:")
-for cat in by_category:
-    if cat != "Uncategorized":
-        print(f"- {cat}: {len(by_category[cat])} posts")
+for cat in ranker.keys():
+    print(f"- {cat}: {ranker.counts[cat]} posts")
+
+# Load text for the winners only (categories × TOP_N posts, chunks reassembled)
+if CATALOG_DIR:
+    rows = load_rows(CATALOG_DIR, "path", ranker.winner_ids(), ["body", "url", "filename", "category", "engagementScore"])
+    winners = {path: (row["body"] or "", {**row, "post_url": row["url"] or ""}) for path, row in rows.items()}
+else:
+    winners = load_full_posts(collection, ranker.winner_ids())
+
+# Summarise categories concurrently (bounded; the LLM client caps in-flight requests too)
+DIGEST_WORKERS = int(os.getenv("DIGEST_WORKERS", 4))
+
+def summarize_top(category):
+    top_docs = []
+    for score, doc_id in ranker.top(category):
+        doc, meta = winners[doc_id]
+        # Ingest already drops bodies under 30 chars; this is only a safety net
+        if len(doc.strip()) < 30:
+            print(f"⏩ Skipping doc (short): {meta.get('filename')}")
+            continue
+        top_docs.append((score, doc, {**meta, "post_url": post_url_for(meta)}))
+    return top_docs, summarize_category(category, top_docs)
+
+categories = [category for category in ranker.keys() if category != "Uncategorized"]
+with ThreadPoolExecutor(max_workers=DIGEST_WORKERS) as pool:
+    summaries = list(pool.map(summarize_top, categories))  # map keeps category order
 
 # Digest build
 digest_lines = ["# 📬 Weekly AI & Startup Digest\n"]
@@ -48,13 +94,7 @@ imp_notes = ["## 📌 🔹 Top Insights\n"]
 def anchor_from_category(cat):
     return quote(cat.lower().replace(" ", "-")).replace("/", "-")
 
-for category, items in by_category.items():
-    if category == "Uncategorized" or len(items) == 0:
-        continue
-
-    top_docs = sorted(items, reverse=True)[:5]
-    summary, actions = summarize_category(category, top_docs)
-
+for category, (top_docs, (summary, actions)) in zip(categories, summaries):
     if not summary:
         continue
 
@@ -1,5 +1,6 @@
 # summarize_category.py
 
+from concurrent.futures import ThreadPoolExecutor
 from embed_mistral import run_mistral_summary
 
 def summarize_category(category, top_docs):
@@ -29,12 +30,6 @@ Posts:
 {combined}
 """
 
-    print(f"[INFO] Summarizing category: {category}")
-    response = run_mistral_summary(summary_prompt)
-
-    if not response:
-        return None, None
-
     # Takeaways prompt
     actions_prompt = f"""
 Summarize 3 sharp, one-line takeaways for startup founders or PMs based on the top LinkedIn posts in "{category}".
@@ -49,6 +44,15 @@ Avoid fluff. Use metrics/tools/startups when possible.
 Posts:
 {combined}
 """
-    actions = run_mistral_summary(actions_prompt)
 
-    return response.strip(), actions.strip()
\ No newline at end of file
+    # Both prompts read the same posts, so run them side by side
+    print(f"[INFO] Summarizing category: {category}")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        summary_future = pool.submit(run_mistral_summary, summary_prompt)
+        actions_future = pool.submit(run_mistral_summary, actions_prompt)
+        response, actions = summary_future.result(), actions_future.result()
+
+    if not response:
+        return None, None
+
+    return response.strip(), (actions or "").strip()
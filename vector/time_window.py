@@ -0,0 +1,75 @@
+# time_window.py
+# Time windows for the digest builders ("this week" instead of every post ever ingested).
+# Ingest stores scrapedAt as int epoch seconds in TIMESTAMP_FIELD, so a window is pushed
+# down to Chroma as a $gte / $lte range filter; the post catalog filters its scrapedAt
+# column and prunes month partitions instead.
+#
+# DIGEST_WINDOW_DAYS (default 7) sets the default window; 0 or empty → all posts.
+# Posts ingested before TIMESTAMP_FIELD existed have no value and fall outside any window.
+
+import os
+from datetime import datetime, timedelta, timezone
+
+try:
+    from .post_parser import TIMESTAMP_FIELD, parse_datetime, to_epoch
+except ImportError:  # imported as a top-level module from inside vector/
+    from post_parser import TIMESTAMP_FIELD, parse_datetime, to_epoch
+
+DIGEST_WINDOW_DAYS = os.getenv("DIGEST_WINDOW_DAYS", "7")
+
+
+def as_datetime(value):
+    """datetime / ISO string / epoch seconds → aware datetime (None stays None)."""
+    if value is None or isinstance(value, datetime):
+        return value if value is None or value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Unparseable time: {value!r}")
+    return parsed
+
+
+def resolve_window(since=None, until=None, days=None, now=None):
+    """
+    (since, until) as aware datetimes, either bound None = open. `days` counts back
+    from `until` (or now) when since isn't given. With no arguments → DIGEST_WINDOW_DAYS.
+    """
+    if since is None and until is None and days is None:
+        days = float(DIGEST_WINDOW_DAYS) if DIGEST_WINDOW_DAYS else 0
+    since, until = as_datetime(since), as_datetime(until)
+    if since is None and days:
+        since = (until or now or datetime.now(timezone.utc)) - timedelta(days=days)
+    return since, until
+
+
+def and_where(*clauses):
+    """Combine Chroma-style where clauses (None ignored) with $and."""
+    clauses = [c for c in clauses if c]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def chroma_window_where(since=None, until=None):
+    """Range filter on TIMESTAMP_FIELD (Chroma allows one operator per clause, hence $and)."""
+    return and_where(
+        {TIMESTAMP_FIELD: {"$gte": to_epoch(since)}} if since else None,
+        {TIMESTAMP_FIELD: {"$lte": to_epoch(until)}} if until else None,
+    )
+
+
+def catalog_window_where(since=None, until=None):
+    """Filter on the catalog's scrapedAt column, plus month bounds so partitions are pruned."""
+    return and_where(
+        {"month": {"$gte": since.strftime("%Y-%m")}, "scrapedAt": {"$gte": since}} if since else None,
+        {"month": {"$lte": until.strftime("%Y-%m")}, "scrapedAt": {"$lte": until}} if until else None,
+    )
+
+
+def describe_window(since=None, until=None):
+    if not since and not until:
+        return "all posts"
+    start = since.strftime("%Y-%m-%d") if since else "…"
+    end = until.strftime("%Y-%m-%d") if until else "now"
+    return f"{start} → {end}"
@@ -0,0 +1,35 @@
+# topk.py
+# Streaming top-K per key (e.g. per category) with fixed-size min-heaps.
+# Only (score, id) pairs are held while scanning — O(N log k) time, memory bounded
+# by keys × k — and the winners' documents/metadata are fetched afterwards
+# (chunking.load_full_posts, or the catalog).
+
+import heapq
+
+
+class TopKPerKey:
+    def __init__(self, k):
+        self.k = k
+        self.heaps = {}
+        self.counts = {}
+
+    def push(self, key, score, item_id):
+        """Offer one candidate; ties on score are broken by the (short) id string."""
+        self.counts[key] = self.counts.get(key, 0) + 1
+        entry = (score, item_id)
+        heap = self.heaps.setdefault(key, [])
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def top(self, key):
+        """[(score, id), ...] best first."""
+        return sorted(self.heaps.get(key, []), reverse=True)
+
+    def keys(self):
+        return list(self.heaps)
+
+    def winner_ids(self):
+        return [item_id for heap in self.heaps.values() for _, item_id in heap]
+
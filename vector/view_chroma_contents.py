@@ -1,5 +1,6 @@
 from chromadb import PersistentClient
 from chromadb.config import Settings
+from chroma_scan import iter_collection
 
 CHROMA_PATH = "chroma_db"
 COLLECTION_NAME = "linkedin-posts"
@@ -7,11 +8,9 @@ COLLECTION_NAME = "linkedin-posts"
 client = PersistentClient(path=CHROMA_PATH)
 collection = client.get_or_create_collection(name=COLLECTION_NAME)
 
-docs = collection.get(include=["documents", "metadatas"])
+print(f"✅ Stored Documents: {collection.count()}\n")
 
-print(f"✅ Stored Documents: {len(docs['ids'])}\n")
-
-for i, (doc_id, doc, meta) in enumerate(zip(docs['ids'], docs['documents'], docs['metadatas']), 1):
+for i, (doc_id, doc, meta) in enumerate(iter_collection(collection), 1):
     filename = meta.get("filename", "N/A")
     category = meta.get("category", "Uncategorized")
     url = meta.get("url", "N/A")